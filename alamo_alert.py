@@ -4,34 +4,204 @@ Alamo Drafthouse Austin – New Movie Alert (2025)
 Detects NEW MOVIE TITLES from calendar table – crash-proof.
 """
 
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import http.client
 import logging
 import os
 import json
+import queue
+import random
+import re
+import signal
+import sqlite3
+import sys
+import threading
 import time
-from datetime import datetime
-from typing import Set, List
+import unicodedata
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from typing import Set, List, Optional, Dict, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     TimeoutException, WebDriverException, NoSuchElementException
 )
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # optional; the "lxml" extractor falls back to "strainer"
+    lxml_html = None
 
 # ============================= CONFIG =============================
-URL = "https://drafthouse.com/austin?showCalendar=true"
-CACHE_FILE = "alamo_movie_cache.json"
+URL_TEMPLATE = "https://drafthouse.com/{market}?showCalendar=true"
+# Comma-separated markets, e.g. "austin,houston,san-antonio,nyc".
+# An entry may also be "name=url" to point a market at a specific calendar URL.
+THEATERS_SPEC = os.getenv("THEATERS", "austin")
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+THEATER_TIMEOUT = float(os.getenv("THEATER_TIMEOUT", "120"))
+CACHE_DB = os.getenv("CACHE_DB", "alamo_movie_cache.db")
+CACHE_FILE = "alamo_movie_cache.json"  # legacy; imported into CACHE_DB once
+# A title is forgotten only after this many consecutive runs without it
+MISS_EXPIRY = int(os.getenv("MISS_EXPIRY", "6"))
+# Films whose normalized titles share at least this fraction of trigrams
+# (and the same numbers, digits, numerals or words, so sequels stay apart)
+# are one film; 1 = exact only
+TITLE_MATCH_THRESHOLD = float(os.getenv("TITLE_MATCH_THRESHOLD", "0.85"))
+# What goes in the alert besides brand-new films: any of dates, showtimes, on_sale
+ALERT_EVENTS = os.getenv("ALERT_EVENTS", "")
 LOG_FILE = "alamo_alert.log"
-SCREENSHOT = "debug_calendar.png"
+# Per-phase timings: one JSON line per run, plus an optional Prometheus
+# textfile-collector file (e.g. /var/lib/node_exporter/textfile/alamo.prom)
+METRICS_FILE = os.getenv("METRICS_FILE", "alamo_metrics.jsonl")
+PROM_FILE = os.getenv("PROM_FILE", "")
+METRICS_SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "0.25"))
+# Debug captures: a gzip'd snapshot of the calendar tables (the whole page
+# if there are none), plus a PNG if CAPTURE_SCREENSHOT. CAPTURE_POLICY is
+# "failure" (default), "always" or "off"; only the newest CAPTURE_KEEP
+# captures are kept
+CAPTURE_POLICY = os.getenv("CAPTURE_POLICY", "failure").lower()
+CAPTURE_SCREENSHOT = os.getenv("CAPTURE_SCREENSHOT", "false").lower() == "true"
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", ".")
+CAPTURE_KEEP = int(os.getenv("CAPTURE_KEEP", "10"))
+
+# "http" = plain HTTP only, "selenium" = headless Chrome only,
+# "auto" = HTTP first, Chrome if HTTP comes back empty
+FETCH_MODE = os.getenv("FETCH_MODE", "auto").lower()
+API_URL = os.getenv(
+    "ALAMO_API_URL", "https://drafthouse.com/s/mother/v2/schedule/market/{market}"
+)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+# Paged schedule APIs: once the paging parameter is known, fetch the rest of
+# the pages directly, this many at a time, instead of clicking Load More
+PAGE_FETCH_WORKERS = int(os.getenv("PAGE_FETCH_WORKERS", "4"))
+
+# Date-sharded calendar: fetch SHARD_WINDOWS windows of SHARD_DAYS days each
+# (7 = Monday-aligned weeks, 1 = days; 0 = one unsharded page) by appending
+# SHARD_PARAMS to the calendar URL, and merge them. Windows starting more
+# than SHARD_HOT_DAYS out are reused from the last fetch for up to
+# SHARD_MAX_AGE hours. Shards go through the market's one browser in turn;
+# only FETCH_MODE=http fetches SHARD_WORKERS at once. Raise THEATER_TIMEOUT
+# to cover all of a market's shards.
+SHARD_DAYS = int(os.getenv("SHARD_DAYS", "0"))
+SHARD_WINDOWS = int(os.getenv("SHARD_WINDOWS", "4"))
+SHARD_PARAMS = os.getenv("SHARD_PARAMS", "startDate={start}&endDate={end}")
+SHARD_HOT_DAYS = int(os.getenv("SHARD_HOT_DAYS", "14"))
+SHARD_MAX_AGE = float(os.getenv("SHARD_MAX_AGE", "24"))
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "2"))
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/141.0 Safari/537.36"
+)
+
+# How film links are pulled out of the calendar:
+#   js       – one in-page table walk (Selenium only; HTML falls back to lxml)
+#   lxml     – lxml tree walk (falls back to strainer without lxml)
+#   strainer – BeautifulSoup parsing only <table> elements
+#   soup     – BeautifulSoup full-page html.parser (original behaviour)
+EXTRACTOR = os.getenv("EXTRACTOR", "lxml").lower()
+
+# Per-phase wait budgets (seconds). Each phase returns as soon as the page is
+# ready; the budget only matters when it isn't.
+PAGE_READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "20"))
+LOAD_MORE_TIMEOUT = float(os.getenv("LOAD_MORE_TIMEOUT", "10"))
+SCROLL_SETTLE_TIMEOUT = float(os.getenv("SCROLL_SETTLE_TIMEOUT", "5"))
+# Selenium: extract rows after every Load More / scroll step and stop once a
+# step adds nothing, instead of scrolling blind and extracting at the end
+HARVEST = os.getenv("HARVEST", "true").lower() == "true"
+# Once the page is idle, how long to wait for any known calendar markup
+# before declaring the layout unrecognized
+LAYOUT_GRACE = float(os.getenv("LAYOUT_GRACE", "5"))
+HARVEST_MAX_STEPS = int(os.getenv("HARVEST_MAX_STEPS", "100"))
+# Selenium: build the calendar from the schedule API's JSON responses as the
+# page fetches them (read back from Chrome's network log), and stop paging
+# once the API says there are no more. XHR_URL_PATTERNS are URL substrings.
+XHR_CAPTURE = os.getenv("XHR_CAPTURE", "true").lower() == "true"
+XHR_URL_PATTERNS = [p.strip() for p in os.getenv("XHR_URL_PATTERNS", "/s/mother/,/api/").split(",") if p.strip()]
+DOM_QUIET_MS = int(os.getenv("DOM_QUIET_MS", "400"))
+NETWORK_IDLE_MS = int(os.getenv("NETWORK_IDLE_MS", "500"))
+WAIT_POLL = 0.1
+
+# Daemon mode (--daemon): one warm Chrome reused across polls
+DAEMON_INTERVAL = int(os.getenv("DAEMON_INTERVAL", "1800"))
+DRIVER_MAX_POLLS = int(os.getenv("DRIVER_MAX_POLLS", "48"))
+DRIVER_MAX_RSS_MB = int(os.getenv("DRIVER_MAX_RSS_MB", "1500"))
+
+# Low-memory Chrome profile: one renderer, no site isolation, background
+# services off, small disk cache and V8 heap, smaller viewport.
+# CHROME_SINGLE_PROCESS also folds the browser into one process; only use it
+# with MAX_WORKERS=1-style setups where a renderer crash may take Chrome down
+CHROME_LOW_MEMORY = os.getenv("CHROME_LOW_MEMORY", "false").lower() == "true"
+CHROME_SINGLE_PROCESS = os.getenv("CHROME_SINGLE_PROCESS", "false").lower() == "true"
+CHROME_DISK_CACHE_MB = int(os.getenv("CHROME_DISK_CACHE_MB", "16"))
+CHROME_JS_HEAP_MB = int(os.getenv("CHROME_JS_HEAP_MB", "512"))
+LOW_MEMORY_WINDOW = os.getenv("LOW_MEMORY_WINDOW", "1024,768")
+# Kill Chrome mid-scrape if its process tree passes this (0 = off), so the
+# scrape fails and the driver is recycled instead of the runner OOMing
+WATCHDOG_RSS_MB = int(os.getenv("WATCHDOG_RSS_MB", "2500"))
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "0.5"))
+
+# Adaptive polling (--adaptive): --interval becomes the baseline, shortened
+# in hours of the week when new films have historically appeared and
+# stretched in quiet ones, within a daily request budget
+POLL_MIN_INTERVAL = int(os.getenv("POLL_MIN_INTERVAL", "300"))
+POLL_MAX_INTERVAL = int(os.getenv("POLL_MAX_INTERVAL", "7200"))
+POLL_DAILY_BUDGET = int(os.getenv("POLL_DAILY_BUDGET", "96"))
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.15"))
+SCHEDULE_HISTORY_DAYS = int(os.getenv("SCHEDULE_HISTORY_DAYS", "90"))
+
+# Resource blocking in Chrome (CDP Network.setBlockedURLs). Categories:
+# images, fonts, media, trackers. setBlockedURLs only takes deny patterns and
+# can't exempt a URL from one, so there is no CSS category (it would hit the
+# app's own stylesheets, which Load More's visibility depends on).
+# CRITICAL_URLS are comma-separated fragments of requests the page needs
+# (the calendar API, app JS); if one is ever blocked it is logged as a warning.
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "images,fonts,media,trackers")
+CRITICAL_URLS = os.getenv("CRITICAL_URLS", "drafthouse.com/s/mother,drafthouse.com/_next")
+BLOCK_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*use.typekit.net*"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*youtube.com/embed*", "*ytimg.com*", "*player.vimeo.com*"],
+    "trackers": [
+        "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+        "*connect.facebook.net*", "*hotjar.com*", "*segment.io*", "*cdn.segment.com*",
+        "*newrelic.com*", "*nr-data.net*", "*sentry.io*", "*tiktok.com*", "*clarity.ms*",
+    ],
+}
 
 EMAIL_ENABLED = os.getenv("EMAIL_ENABLED", "false").lower() == "true"
 EMAIL_TO = os.getenv("EMAIL_TO")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 EMAIL_SMTP = os.getenv("EMAIL_SMTP", "smtp.gmail.com:587")
+EMAIL_STARTTLS = os.getenv("EMAIL_STARTTLS", "true").lower() == "true"
+# Undelivered alerts wait in the outbox table and are retried with backoff
+OUTBOX_RETRY_BASE = int(os.getenv("OUTBOX_RETRY_BASE", "60"))
+OUTBOX_RETRY_MAX = int(os.getenv("OUTBOX_RETRY_MAX", "3600"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))
+# Every enabled notifier has its own outbox queue and they are sent to
+# concurrently; a backend that overruns NOTIFY_TIMEOUT is retried next flush
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "30"))
+NOTIFY_FILE = os.getenv("NOTIFY_FILE", "")  # "-" for stdout
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # generic JSON POST
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
+NTFY_URL = os.getenv("NTFY_URL", "")  # https://ntfy.sh/<topic>
+NTFY_TOKEN = os.getenv("NTFY_TOKEN", "")
 
 # =================================================================
 
@@ -43,51 +213,534 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+def parse_theaters(spec: str) -> Dict[str, str]:
+    """Market name -> calendar URL."""
+    theaters = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        market, _, url = entry.partition("=")
+        market = market.strip()
+        theaters[market] = url.strip() or URL_TEMPLATE.format(market=market)
+    return theaters
+
+
+THEATERS = parse_theaters(THEATERS_SPEC)
+
+
+def theater_name(market: str) -> str:
+    return market.replace("-", " ").title()
+
+
 def get_driver():
     opts = Options()
     opts.add_argument("--headless=new")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--disable-gpu")
-    opts.add_argument("--window-size=1400,1200")  # Smaller = less RAM
+    opts.add_argument(f"--window-size={LOW_MEMORY_WINDOW if CHROME_LOW_MEMORY else '1400,1200'}")  # Smaller = less RAM
     opts.add_argument("--disable-extensions")
-    opts.add_argument("--disable-images")  # Speed + memory
-    opts.add_argument("--disable-javascript")  # No, wait — we NEED JS
     opts.add_argument("--blink-settings=imagesEnabled=false")
+    if CHROME_LOW_MEMORY:
+        for arg in low_memory_args():
+            opts.add_argument(arg)
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
-    opts.add_argument(
-        "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/141.0 Safari/537.36"
-    )
+    opts.add_argument(f"--user-agent={USER_AGENT}")
+    # Network events only, for the per-run byte accounting
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    opts.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
     driver = webdriver.Chrome(options=opts)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => false});")
     driver.set_page_load_timeout(30)
+    enable_resource_blocking(driver)
     log.info("Driver initialized")
     return driver
 
 
-def wait_for_calendar(driver):
-    log.info("Waiting for calendar table...")
-    WebDriverWait(driver, 20).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "table"))
+def low_memory_args() -> List[str]:
+    args = [
+        "--renderer-process-limit=1",
+        "--disable-site-isolation-trials",
+        "--disable-features=site-per-process,IsolateOrigins,Translate,OptimizationHints,MediaRouter,BackForwardCache",
+        "--disable-background-networking",
+        "--disable-sync",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--no-first-run",
+        "--mute-audio",
+        f"--disk-cache-size={CHROME_DISK_CACHE_MB * 1024 * 1024}",  # in the throwaway profile dir
+        "--media-cache-size=1",
+        f"--js-flags=--max-old-space-size={CHROME_JS_HEAP_MB}",
+    ]
+    if CHROME_SINGLE_PROCESS:
+        args.append("--single-process")
+    return args
+
+
+def blocked_url_patterns() -> List[str]:
+    """Deny patterns for the enabled categories."""
+    patterns = []
+    for category in filter(None, (c.strip() for c in BLOCK_RESOURCES.split(","))):
+        if category not in BLOCK_PATTERNS:
+            log.warning(f"Unknown BLOCK_RESOURCES category: {category}")
+        patterns += BLOCK_PATTERNS.get(category, ())
+    return patterns
+
+
+def enable_resource_blocking(driver):
+    patterns = blocked_url_patterns()
+    driver.execute_cdp_cmd("Network.enable", {})
+    if patterns:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    log.info(f"Blocking {len(patterns)} URL pattern(s): {BLOCK_RESOURCES}")
+
+
+def drain_network_log(driver) -> List[dict]:
+    """Pop the buffered performance log as CDP Network.* events."""
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return []
+    events = []
+    for entry in entries:
+        msg = json.loads(entry["message"])["message"]
+        if msg["method"].startswith("Network."):
+            events.append(msg)
+    return events
+
+
+def network_usage(events: List[dict]) -> Dict[str, int]:
+    """Tally allowed vs. blocked requests and the bytes the allowed ones cost.
+
+    Blocked requests never hit the wire, so only their count is known.
+    """
+    urls: Dict[str, str] = {}
+    usage = {"allowed": 0, "allowed_bytes": 0, "blocked": 0, "failed": 0}
+    critical = [a.strip() for a in CRITICAL_URLS.split(",") if a.strip()]
+    for ev in events:
+        params = ev["params"]
+        if ev["method"] == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+        elif ev["method"] == "Network.loadingFinished":
+            usage["allowed"] += 1
+            usage["allowed_bytes"] += int(params.get("encodedDataLength", 0))
+        elif ev["method"] == "Network.loadingFailed":
+            if params.get("blockedReason"):
+                usage["blocked"] += 1
+                url = urls.get(params["requestId"], "")
+                if any(a in url for a in critical):
+                    log.warning(f"Critical request was blocked: {url}")
+            else:
+                usage["failed"] += 1
+    return usage
+
+
+def log_network_usage(driver, market: str, seen: Optional[List[dict]] = None):
+    """Log the run's traffic; `seen` holds events already drained by someone else."""
+    u = network_usage((seen or []) + drain_network_log(driver))
+    log.info(
+        f"[{market}] Network: {u['allowed']} allowed ({u['allowed_bytes'] / 1024:.0f} KB), "
+        f"{u['blocked']} blocked, {u['failed']} failed"
     )
-    log.info("Calendar table found")
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _process_table() -> Tuple[Dict[int, List[int]], Dict[int, Tuple[int, float]]]:
+    """(children by ppid, (RSS bytes, CPU seconds) by pid) from /proc; empty elsewhere."""
+    children: Dict[int, List[int]] = {}
+    stats: Dict[int, Tuple[int, float]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children, stats
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm may contain spaces; count fields from the last ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+            ppid, utime, stime, rss = int(fields[1]), int(fields[11]), int(fields[12]), int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+        stats[int(entry)] = (rss * _PAGE_SIZE, (utime + stime) / _CLK_TCK)
+    return children, stats
+
+
+def process_descendants(pid: int, children: Optional[Dict[int, List[int]]] = None) -> List[int]:
+    children = _process_table()[0] if children is None else children
+    found, stack = [], list(children.get(pid, ()))
+    while stack:
+        p = stack.pop()
+        found.append(p)
+        stack.extend(children.get(p, ()))
+    return found
+
+
+def process_tree_stats(pid: int) -> Tuple[int, float]:
+    """(RSS bytes, CPU seconds) of `pid` plus all its descendants, e.g. Python
+    plus chromedriver plus every Chrome process (Linux /proc; zeros elsewhere)."""
+    children, stats = _process_table()
+    rss_total, cpu_total = 0, 0.0
+    for p in [pid] + process_descendants(pid, children):
+        rss, cpu = stats.get(p, (0, 0.0))
+        rss_total += rss
+        cpu_total += cpu
+    return rss_total, cpu_total
+
+
+def process_tree_rss(pid: int) -> int:
+    """RSS in bytes of `pid` plus all its descendants."""
+    return process_tree_stats(pid)[0]
+
+
+# === METRICS ===
+class RunMetrics:
+    """Wall time, CPU time and peak RSS per phase for one run.
+
+    A background thread samples the RSS of the whole process tree (Python,
+    chromedriver, Chrome) and raises the peak of every phase open at the
+    time. cpu_s is the calling thread's CPU; tree_cpu_s is the whole tree,
+    Chrome included, so it overlaps when theaters run concurrently.
+    """
+
+    def __init__(self, interval: float = METRICS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.started = time.time()
+        self.records: List[dict] = []
+        self.extra: Dict[str, float] = {}
+        self._open: List[dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="metrics", daemon=True)
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = process_tree_rss(os.getpid())
+            with self._lock:
+                for rec in self._open:
+                    rec["peak_rss"] = max(rec["peak_rss"], rss)
+
+    @contextmanager
+    def phase(self, name: str, market: str = ""):
+        rss, tree_cpu = process_tree_stats(os.getpid())
+        rec = {"phase": name, "market": market, "peak_rss": rss}
+        wall, cpu = time.perf_counter(), time.thread_time()
+        with self._lock:
+            self._open.append(rec)
+        try:
+            yield rec
+        finally:
+            rss, tree_cpu_end = process_tree_stats(os.getpid())
+            with self._lock:
+                self._open.remove(rec)
+            rec["peak_rss"] = max(rec["peak_rss"], rss)
+            rec["wall_s"] = round(time.perf_counter() - wall, 4)
+            rec["cpu_s"] = round(time.thread_time() - cpu, 4)
+            rec["tree_cpu_s"] = round(tree_cpu_end - tree_cpu, 4)
+            self.records.append(rec)
+
+    def close(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def summary(self) -> dict:
+        return {
+            "ts": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "wall_s": round(time.time() - self.started, 4),
+            "peak_rss": max((r["peak_rss"] for r in self.records), default=0),
+            **self.extra,
+            "phases": self.records,
+        }
+
+    def write(self, jsonl_path: str = METRICS_FILE, prom_path: str = PROM_FILE):
+        summary = self.summary()
+        if jsonl_path:
+            with open(jsonl_path, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        if prom_path:
+            write_prometheus(summary, prom_path)
+        log.info(
+            f"Run took {summary['wall_s']:.2f}s, peak RSS {summary['peak_rss'] / 1e6:.0f} MB; slowest: "
+            + ", ".join(
+                f"{r['market'] + '/' if r['market'] else ''}{r['phase']} {r['wall_s']:.2f}s"
+                for r in sorted(self.records, key=lambda r: -r["wall_s"])[:3]
+            )
+        )
+
+
+def write_prometheus(summary: dict, path: str):
+    """node_exporter textfile-collector format, written atomically. Repeated
+    phases (per-step, per-source) are summed, their peak RSS maxed."""
+    agg: Dict[Tuple[str, str], List[float]] = {}
+    for r in summary["phases"]:
+        a = agg.setdefault((r["phase"], r["market"]), [0.0, 0.0, 0.0, 0])
+        a[0] += r["wall_s"]
+        a[1] += r["cpu_s"]
+        a[2] += r["tree_cpu_s"]
+        a[3] = max(a[3], r["peak_rss"])
+    lines = []
+    for metric, idx, help_ in (
+        ("alamo_phase_wall_seconds", 0, "Wall time per phase in the last run"),
+        ("alamo_phase_cpu_seconds", 1, "Python thread CPU time per phase in the last run"),
+        ("alamo_phase_tree_cpu_seconds", 2, "Process-tree CPU time (incl. Chrome) per phase in the last run"),
+        ("alamo_phase_peak_rss_bytes", 3, "Peak process-tree RSS (incl. Chrome) per phase in the last run"),
+    ):
+        lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} gauge"]
+        for (phase, market), a in sorted(agg.items()):
+            lines.append(f'{metric}{{phase="{phase}",market="{market}"}} {a[idx]}')
+    for metric, key in (
+        ("alamo_run_wall_seconds", "wall_s"),
+        ("alamo_run_peak_rss_bytes", "peak_rss"),
+        ("alamo_run_new_films", "new_films"),
+    ):
+        if key in summary:
+            lines += [f"# TYPE {metric} gauge", f"{metric} {summary[key]}"]
+    lines += ["# TYPE alamo_run_timestamp_seconds gauge", f"alamo_run_timestamp_seconds {time.time():.0f}"]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+_metrics: Optional[RunMetrics] = None
+
+
+def phase(name: str, market: str = ""):
+    """Time a phase against the current run's metrics (no-op outside a run)."""
+    return _metrics.phase(name, market) if _metrics else nullcontext()
+
+
+class WarmDriver:
+    """Keeps one Chrome session alive across polls and recycles it when it goes bad."""
+
+    def __init__(self, max_polls: int = DRIVER_MAX_POLLS, max_rss_mb: int = DRIVER_MAX_RSS_MB):
+        self.max_polls = max_polls
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.polls = 0
+
+    def get(self):
+        if self.driver is not None:
+            if not self.healthy():
+                self.recycle("failed health check")
+            elif self.polls >= self.max_polls:
+                self.recycle(f"reached {self.polls} polls")
+            else:
+                rss = self.rss_mb()
+                if rss > self.max_rss_mb:
+                    self.recycle(f"RSS {rss:.0f} MB > {self.max_rss_mb} MB")
+        if self.driver is None:
+            self.driver = get_driver()
+            self.polls = 0
+        self.polls += 1
+        return self.driver
+
+    def healthy(self) -> bool:
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def rss_mb(self) -> float:
+        try:
+            return process_tree_rss(self.driver.service.process.pid) / 1e6
+        except Exception:
+            return 0.0
+
+    def recycle(self, reason: str):
+        log.info(f"Recycling driver: {reason}")
+        self.close()
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                log.warning(f"Driver quit failed: {e}")
+            self.driver = None
+
+
+class MemoryWatchdog:
+    """Samples one driver's process tree (chromedriver + Chrome) during a
+    scrape and SIGKILLs the Chrome processes once it passes limit_mb, so the
+    in-flight WebDriver call fails fast and the driver gets recycled."""
+
+    def __init__(self, driver, market: str = "", limit_mb: int = WATCHDOG_RSS_MB,
+                 interval: float = WATCHDOG_INTERVAL):
+        self.market = market
+        self.limit = limit_mb * 1e6
+        self.interval = interval
+        self.peak = 0
+        self.tripped = False
+        try:
+            self.pid = driver.service.process.pid
+        except AttributeError:
+            self.pid = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watchdog-{market}", daemon=True)
+
+    def start(self) -> "MemoryWatchdog":
+        if self.pid:
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = process_tree_rss(self.pid)
+            self.peak = max(self.peak, rss)
+            if self.limit and rss > self.limit:
+                self.tripped = True
+                log.error(f"[{self.market}] Chrome at {rss / 1e6:.0f} MB > {self.limit / 1e6:.0f} MB; killing it")
+                for child in process_descendants(self.pid):
+                    try:
+                        os.kill(child, signal.SIGKILL)
+                    except OSError:
+                        pass
+                return
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.pid:
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+
+
+# === WAITS ===
+# Installed once per page: a MutationObserver stamping the last DOM change and
+# fetch/XHR wrappers counting in-flight requests.
+WATCHERS_JS = """
+if (!window.__alamoWatch) {
+  window.__alamoWatch = true;
+  window.__alamoLastMutation = performance.now();
+  window.__alamoInflight = 0;
+  new MutationObserver(() => { window.__alamoLastMutation = performance.now(); })
+    .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  const origFetch = window.fetch;
+  if (origFetch) {
+    window.fetch = function() {
+      window.__alamoInflight++;
+      return origFetch.apply(this, arguments).finally(() => { window.__alamoInflight--; });
+    };
+  }
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function() {
+    window.__alamoInflight++;
+    this.addEventListener('loadend', () => { window.__alamoInflight--; });
+    return origSend.apply(this, arguments);
+  };
+}
+"""
+
+DOM_QUIET_JS = "return performance.now() - (window.__alamoLastMutation || 0) >= arguments[0];"
+
+NETWORK_IDLE_JS = """
+if (document.readyState !== 'complete' || (window.__alamoInflight || 0) > 0) return false;
+let last = 0;
+for (const e of performance.getEntriesByType('resource')) last = Math.max(last, e.responseEnd);
+return performance.now() - last >= arguments[0];
+"""
+
+LINK_COUNT_JS = "return document.querySelectorAll('table td a').length;"
+AT_BOTTOM_JS = "return window.innerHeight + window.scrollY >= document.documentElement.scrollHeight - 2;"
+
+
+def install_watchers(driver):
+    driver.execute_script(WATCHERS_JS)
+
+
+def dom_quiet(ms: int = DOM_QUIET_MS):
+    return lambda d: d.execute_script(DOM_QUIET_JS, ms)
+
+
+def network_idle(ms: int = NETWORK_IDLE_MS):
+    return lambda d: d.execute_script(NETWORK_IDLE_JS, ms)
+
+
+def link_count(driver) -> int:
+    return driver.execute_script(LINK_COUNT_JS)
+
+
+def wait_phase(driver, phase: str, condition, timeout: float, level=logging.INFO) -> bool:
+    """Wait until `condition` holds or `timeout` runs out; log the real wait."""
+    start = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL).until(condition)
+        ok = True
+    except TimeoutException:
+        ok = False
+    waited = time.monotonic() - start
+    log.log(level, f"Wait [{phase}]: {waited:.2f}s" + ("" if ok else f" (timed out, budget {timeout:g}s)"))
+    return ok
+
+
+PRESENT_MARKERS_JS = """
+return Object.entries(arguments[0]).filter(([name, css]) => document.querySelector(css)).map(([name]) => name);
+"""
+
+
+def present_strategies(driver) -> List[str]:
+    return driver.execute_script(PRESENT_MARKERS_JS, {name: marker for name, (marker, _, _) in STRATEGIES.items()})
+
+
+def wait_for_calendar(driver, idle: bool = False) -> List[str]:
+    """Wait until any strategy's markup is on the page; return which are.
+
+    Bare /film/ links ("cards") also sit in nav bars and carousels that
+    render before the calendar, so they only count once LAYOUT_GRACE has
+    passed without anything richer. If the page already went network-idle
+    without any markup, only LAYOUT_GRACE is spent before failing: that is
+    a layout change, not a slow page.
+    """
+    log.info("Waiting for calendar markup...")
+    timeout = LAYOUT_GRACE if idle else PAGE_READY_TIMEOUT
+    start = time.monotonic()
+
+    def ready(d) -> bool:
+        present = present_strategies(d)
+        return any(n != "cards" for n in present) or (bool(present) and time.monotonic() - start >= LAYOUT_GRACE)
+
+    if not wait_phase(driver, "calendar", ready, max(timeout, LAYOUT_GRACE + WAIT_POLL)):
+        raise TimeoutException(
+            f"No known calendar markup ({', '.join(STRATEGIES)}) after {timeout:g}s; page layout may have changed"
+        )
+    present = present_strategies(driver)
+    log.info(f"Calendar markup found: {', '.join(present)}")
+    return present
 
 
 def click_load_more(driver):
-    """Click 'Load More' if exists."""
-    loaded = 0
+    """Click 'Load More' until it's gone or stops adding rows."""
+    loaded, start = 0, time.monotonic()
     while True:
         try:
             btn = driver.find_element(By.XPATH, "//button[contains(., 'Load More')]")
+            if not btn.is_displayed():
+                raise NoSuchElementException("Load More hidden")
+            before = link_count(driver)
             driver.execute_script("arguments[0].scrollIntoView(true);", btn)
             driver.execute_script("arguments[0].click();", btn)
             log.info("Clicked Load More")
-            time.sleep(3)
+            grew = wait_phase(
+                driver, "load_more",
+                lambda d: link_count(d) > before and dom_quiet()(d),
+                LOAD_MORE_TIMEOUT,
+            )
             loaded += 1
+            if not grew:
+                log.warning("Load More added no rows, stopping")
+                break
         except NoSuchElementException:
-            log.info(f"Load More clicked {loaded} time(s)")
+            secs = time.monotonic() - start
+            log.info(f"Load More clicked {loaded} time(s) in {secs:.2f}s ({loaded / secs if secs else 0:.1f} pages/s)")
             break
         except Exception as e:
             log.warning(f"Load More failed: {e}")
@@ -95,113 +748,2532 @@ def click_load_more(driver):
 
 
 def scroll_gently(driver):
-    """Scroll in small steps to avoid crash."""
+    """Scroll in small steps to avoid crash; each step waits for the DOM to settle."""
     log.info("Scrolling gently...")
-    for _ in range(8):
+    start = time.monotonic()
+    for step in range(8):
         driver.execute_script("window.scrollBy(0, 1000);")
-        time.sleep(1.5)
-    log.info("Gentle scroll complete")
+        wait_phase(
+            driver, f"scroll {step + 1}",
+            lambda d: dom_quiet()(d) and network_idle()(d),
+            SCROLL_SETTLE_TIMEOUT, level=logging.DEBUG,
+        )
+        if driver.execute_script(AT_BOTTOM_JS):
+            break
+    log.info(f"Gentle scroll complete ({step + 1} step(s), {time.monotonic() - start:.2f}s)")
 
 
-def fetch_movie_titles() -> Set[str]:
-    driver = None
-    titles: Set[str] = set()
-    try:
-        driver = get_driver()
-        log.info(f"Loading: {URL}")
-        driver.get(URL)
-        time.sleep(5)
+def keep_title(txt: str) -> bool:
+    """Same filter for every engine: drop blanks, stubs and venue links."""
+    return bool(txt) and len(txt) > 3 and "alamo" not in txt.lower()
 
-        wait_for_calendar(driver)
-        click_load_more(driver)
-        scroll_gently(driver)
 
-        # Final wait for cells
-        WebDriverWait(driver, 15).until(
-            lambda d: len(d.find_elements(By.CSS_SELECTOR, "table td a")) > 10
-        )
+def log_titles(titles: Set[str], market: str = ""):
+    log.info(f"{f'[{market}] ' if market else ''}Extracted {len(titles)} unique titles: {', '.join(sorted(titles)[:5])}{'...' if len(titles)>5 else ''}")
 
-        driver.save_screenshot(SCREENSHOT)
-        log.info(f"Screenshot: {SCREENSHOT}")
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        links = soup.select("table td a[href*='/film/']")
+# === MODEL ===
+FILM_SLUG_RE = re.compile(r"/film/([^/?#]+)")
 
-        log.info(f"Found {len(links)} film links")
 
-        for a in links:
-            txt = a.get_text(strip=True)
-            if txt and len(txt) > 3 and "alamo" not in txt.lower():
-                titles.add(txt)
+def slugify(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
 
-        log.info(f"Extracted {len(titles)} unique titles: {', '.join(sorted(titles)[:5])}{'...' if len(titles)>5 else ''}")
-        return titles
 
-    except Exception as e:
-        log.error(f"SCRAPING FAILED: {e}")
-        if driver:
-            driver.save_screenshot(f"crash_{int(time.time())}.png")
-        return titles
-    finally:
-        if driver:
-            driver.quit()
+def film_slug(href: str, title: str = "") -> str:
+    """The /film/<slug> part of a link; falls back to the slugified title."""
+    m = FILM_SLUG_RE.search(href or "")
+    return m.group(1) if m else slugify(title)
 
 
-# === CACHE & ALERT ===
-def load_cache() -> Set[str]:
-    if not os.path.exists(CACHE_FILE):
-        return set()
+# Presentation/event tags that don't make a different film, matched at the
+# end of a title after a separator or in parentheses. A trailing year is
+# stripped too but kept aside: "Dune (1984)" and "Dune (2021)" are two films.
+TITLE_SUFFIXES = (
+    r"open[- ]?capt(?:ion|ioned)?|oc|quote[- ]?along|sing[- ]?along|sensory[- ]friendly|"
+    r"35 ?mm|70 ?mm|16 ?mm|imax|4k(?: restoration)?|3d|digital|dubbed|subtitled|"
+    r"movie party|feast|brunch|anniversary(?: screening)?|(?:early|advance|special) screening|"
+    r"(?P<year>(?:19|20)\d\d)"
+)
+TITLE_SUFFIX_RE = re.compile(rf"(?:\s*[-:|/]\s*(?:{TITLE_SUFFIXES})|\s*[(\[](?:{TITLE_SUFFIXES.replace('?P<year>', '?P<pyear>')})[)\]])\s*$")
+DASHES_RE = re.compile(r"[\u2010-\u2015\u2212\ufe58\ufe63\uff0d]")
+NON_WORD_RE = re.compile(r"[^\w]+")
+NUMBER_RE = re.compile(r"\d+")
+# Sequel numbering also comes as standalone Roman numerals (I-XXXIX) and words
+ROMAN_RE = re.compile(r"x{0,3}(?:ix|iv|v?i{0,3})")
+ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+NUMBER_WORDS = {w: str(n) for n, w in enumerate(
+    "one two three four five six seven eight nine ten eleven twelve".split(), 1)}
+
+
+def split_title(title: str) -> Tuple[str, Optional[str]]:
+    """(comparable form, release year or None) of a display title: NFKC,
+    casefolded, one kind of dash, event/format suffixes and (year) stripped,
+    punctuation collapsed."""
+    t = DASHES_RE.sub("-", unicodedata.normalize("NFKC", title).casefold()).strip()
+    year = None
+    while True:
+        m = TITLE_SUFFIX_RE.search(t)
+        if not m or not m.start():
+            break
+        year = year or m.group("year") or m.group("pyear")
+        t = t[:m.start()]
+    return NON_WORD_RE.sub(" ", t).strip(), year
+
+
+def normalize_title(title: str) -> str:
+    return split_title(title)[0]
+
+
+def title_numbers(norm: str) -> Tuple[str, ...]:
+    """The numbers in a normalized title, in order and as digits, however
+    written: "part 2", "part ii" and "part two" all give ("2",)."""
+    numbers: List[str] = []
+    for word in norm.split():
+        if word in NUMBER_WORDS:
+            numbers.append(NUMBER_WORDS[word])
+        elif ROMAN_RE.fullmatch(word):
+            values = [ROMAN_VALUES[c] for c in word]
+            numbers.append(str(sum(-v if v < nxt else v for v, nxt in zip(values, values[1:] + [0]))))
+        else:
+            numbers.extend(str(int(n)) for n in NUMBER_RE.findall(word))
+    return tuple(numbers)
+
+
+def title_grams(norm: str) -> Set[str]:
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """Trigram index over normalized titles: exact lookups are a dict hit,
+    fuzzy ones only score titles sharing a trigram with the query."""
+
+    def __init__(self, threshold: float = TITLE_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.exact: Dict[str, List[str]] = {}
+        self.grams: Dict[str, Set[str]] = {}
+        self.numbers: Dict[str, Tuple[str, ...]] = {}
+        self.years: Dict[str, Optional[str]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+
+    def add(self, key: str, title: str):
+        norm, self.years[key] = split_title(title)
+        self.exact.setdefault(norm, []).append(key)
+        grams = title_grams(norm)
+        self.grams[key] = grams
+        self.numbers[key] = title_numbers(norm)
+        for g in grams:
+            self.postings.setdefault(g, set()).add(key)
+
+    def same_year(self, key: str, year: Optional[str]) -> bool:
+        return year is None or self.years[key] is None or year == self.years[key]
+
+    def match(self, title: str) -> Optional[str]:
+        """Key of the same film under another title. Two titles that both
+        carry a year only match if it is the same year."""
+        norm, year = split_title(title)
+        for key in self.exact.get(norm, ()):
+            if self.same_year(key, year):
+                return key
+        if self.threshold >= 1 or len(norm) < 4:
+            return None
+        grams, numbers = title_grams(norm), title_numbers(norm)
+        # Jaccard >= t needs at least t/(1+t) * (|a|+|b|) shared grams, so
+        # anything below t * |a| shared can't qualify
+        min_shared = self.threshold * len(grams)
+        shared = Counter(chain.from_iterable(self.postings.get(g, ()) for g in grams))
+        best, best_score = None, self.threshold
+        for key, n in shared.items():
+            if n < min_shared:
+                continue
+            score = n / (len(grams) + len(self.grams[key]) - n)
+            if score >= best_score and self.numbers[key] == numbers and self.same_year(key, year):
+                best, best_score = key, score
+        return best
+
+
+class Film:
+    __slots__ = ("slug", "title")
+
+    def __init__(self, slug: str, title: str):
+        self.slug = slug
+        self.title = title
+
+    def __repr__(self):
+        return f"Film({self.slug!r}, {self.title!r})"
+
+
+class Showing:
+    """One showtime cell. Identity is (slug, date, time, format); on_sale is state."""
+    __slots__ = ("slug", "date", "time", "format", "on_sale")
+
+    def __init__(self, slug: str, day: str, at: str, format: str = "", on_sale: bool = True):
+        self.slug = slug
+        self.date = day
+        self.time = at
+        self.format = format
+        self.on_sale = on_sale
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.slug, self.date, self.time, self.format)
+
+    def __eq__(self, other):
+        return isinstance(other, Showing) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Showing({self.slug!r}, {self.date!r}, {self.time!r}, {self.format!r}, on_sale={self.on_sale})"
+
+
+class Calendar:
+    """One market's scrape: films keyed by slug, plus their showings.
+
+    `showings` is None when the source carried no showtime data (titles-only
+    API payloads, the JS link extractor), so callers can tell "no showtimes"
+    from "didn't look". `unchanged` marks a fetch that short-circuited
+    because the calendar is identical to the last processed one.
+    """
+    __slots__ = ("films", "showings", "unchanged")
+
+    def __init__(self, films: Optional[Dict[str, Film]] = None, showings: Optional[Set[Showing]] = None,
+                 unchanged: bool = False):
+        self.films = films if films is not None else {}
+        self.showings = showings
+        self.unchanged = unchanged
+
+    @property
+    def titles(self) -> Set[str]:
+        return {f.title for f in self.films.values()}
+
+    def add_film(self, href: str, title: str) -> Optional[str]:
+        if not keep_title(title):
+            return None
+        slug = film_slug(href, title)
+        self.films[slug] = Film(slug, title)
+        return slug
+
+    def __bool__(self):
+        return bool(self.films)
+
+
+def calendar_from_rows(rows) -> Calendar:
+    """Build a Calendar in one pass over neutral table rows.
+
+    Each row is a list of cells, each cell (date, links) with links as
+    (href, text, format, class). A /film/ link names the row's film; any
+    other link with text in a dated cell of that row is a showtime.
+    """
+    cal = Calendar(showings=set())
+    n_links = add_rows(cal, rows)
+    log.info(f"Found {n_links} film links, {len(cal.showings)} showings")
+    if not cal.showings:
+        cal.showings = None
+    return cal
+
+
+def add_rows(cal: Calendar, rows) -> int:
+    """Merge rows into `cal` (whose showings must be a set); returns the number of film links seen."""
+    n_links = 0
+    for cells in rows:
+        slug = None
+        for day, links in cells:
+            for href, text, fmt, cls in links:
+                if "/film/" in href:
+                    n_links += 1
+                    slug = cal.add_film(href, text) or slug
+                elif slug and day and text:
+                    cal.showings.add(Showing(slug, day, text, fmt or "", "sold-out" not in (cls or "")))
+    return n_links
+
+
+def calendar_to_cache(cal: Calendar) -> str:
+    return json.dumps({
+        "films": [[f.slug, f.title] for f in cal.films.values()],
+        "showings": None if cal.showings is None else [list(sh.key) + [sh.on_sale] for sh in cal.showings],
+    })
+
+
+def calendar_from_cache(payload: str) -> Calendar:
+    data = json.loads(payload)
+    return Calendar(
+        {slug: Film(slug, title) for slug, title in data["films"]},
+        None if data["showings"] is None else {Showing(*row) for row in data["showings"]},
+    )
+
+
+def merge_calendars(cals: List[Calendar]) -> Calendar:
+    """Union of several calendars; showings stay None only if none had any."""
+    merged = Calendar()
+    for cal in cals:
+        merged.films.update(cal.films)
+        if cal.showings is not None:
+            merged.showings = (merged.showings or set()) | cal.showings
+    return merged
+
+
+def calendar_digest(cal: Calendar) -> str:
+    """Content hash of an extracted calendar, for sources with no raw payload to hash."""
+    films = sorted((f.slug, f.title) for f in cal.films.values())
+    showings = sorted(sh.key + (sh.on_sale,) for sh in cal.showings or ())
+    return hashlib.sha256(json.dumps([films, showings]).encode()).hexdigest()
+
+
+# === EXTRACTION ===
+# Same row walk as the HTML backends, done in the page. Text mirrors
+# BeautifulSoup's get_text(strip=True): strip each text node, join with "".
+# JS_HARVEST only returns rows that are new or have gained links since its
+# last call on the page.
+JS_ROWS = """
+const text = (el) => {
+  const w = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+  let t = '';
+  for (let n = w.nextNode(); n; n = w.nextNode()) t += n.nodeValue.trim();
+  return t;
+};
+const rows = [];
+for (const table of document.querySelectorAll('table')) {
+  const dates = Array.from(table.querySelectorAll('th'), th => th.getAttribute('data-date'));
+  for (const tr of table.querySelectorAll('tr')) {
+    /*FILTER*/
+    rows.push(Array.from(tr.children).filter(c => c.tagName === 'TD').map((td, i) => [
+      td.getAttribute('data-date') || dates[i] || null,
+      Array.from(td.querySelectorAll('a'), a => [
+        a.getAttribute('href') || '', text(a), a.getAttribute('data-format'), a.getAttribute('class') || '',
+      ]),
+    ]));
+  }
+}
+return rows;
+"""
+JS_EXTRACT = JS_ROWS.replace("/*FILTER*/", "")
+JS_HARVEST = JS_ROWS.replace(
+    "/*FILTER*/",
+    "const n = tr.getElementsByTagName('a').length;"
+    " if (!n || tr.__alamoSeen === n) continue; tr.__alamoSeen = n;",
+)
+
+TABLE_ONLY = SoupStrainer("table")
+
+
+def _soup_rows(soup):
+    for table in soup.find_all("table"):
+        dates = [th.get("data-date") for th in table.find_all("th")]
+        for tr in table.find_all("tr"):
+            yield [
+                (
+                    td.get("data-date") or (dates[i] if i < len(dates) else None),
+                    [
+                        (a.get("href", ""), a.get_text(strip=True), a.get("data-format"), " ".join(a.get("class", [])))
+                        for a in td.find_all("a")
+                    ],
+                )
+                for i, td in enumerate(tr.find_all("td", recursive=False))
+            ]
+
+
+def _lxml_rows(root):
+    for table in root.iter("table"):
+        dates = [th.get("data-date") for th in table.iter("th")]
+        for tr in table.iter("tr"):
+            yield [
+                (
+                    td.get("data-date") or (dates[i] if i < len(dates) else None),
+                    [
+                        (a.get("href", ""), "".join(t.strip() for t in a.itertext()), a.get("data-format"), a.get("class", ""))
+                        for a in td.iter("a")
+                    ],
+                )
+                for i, td in enumerate(tr.iterchildren("td"))
+            ]
+
+
+def extract_soup(html) -> Calendar:
+    return calendar_from_rows(_soup_rows(BeautifulSoup(html, "html.parser")))
+
+
+def extract_strainer(html) -> Calendar:
+    return calendar_from_rows(_soup_rows(BeautifulSoup(html, "html.parser", parse_only=TABLE_ONLY)))
+
+
+def extract_lxml(html) -> Calendar:
+    if not html:
+        return Calendar()
+    return calendar_from_rows(_lxml_rows(lxml_html.fromstring(html)))
+
+
+def extract_js(driver) -> Calendar:
+    return calendar_from_rows(driver.execute_script(JS_EXTRACT))
+
+
+HTML_EXTRACTORS = {
+    "soup": extract_soup,
+    "strainer": extract_strainer,
+    "lxml": extract_lxml,
+}
+
+
+def html_extractor(name: str = ""):
+    name = name or EXTRACTOR
+    if name not in HTML_EXTRACTORS:
+        name = "lxml"
+    if name == "lxml" and lxml_html is None:
+        name = "strainer"
+    return HTML_EXTRACTORS[name]
+
+
+# === HTTP ENGINE ===
+class FetchCache:
+    """ETag / Last-Modified / payload hash per URL from the last processed run.
+
+    Loaded before fetching; new values collect in `updated` and are committed
+    with the state (save_fetch_cache inside update_state), so a run that dies
+    after fetching can't make the next one short-circuit on unprocessed data.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None, strategies: Optional[Dict[str, str]] = None,
+                 shards: Optional[Dict[Tuple[str, str], Tuple[str, str]]] = None):
+        self.entries = entries or {}
+        self.updated: Dict[str, dict] = {}
+        self.strategies = strategies or {}  # market -> last winning extraction strategy
+        self.updated_strategies: Dict[str, str] = {}
+        self.shards = shards or {}  # (market, window start) -> (fetched, calendar JSON)
+        self.updated_shards: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    def fork(self) -> "FetchCache":
+        """A view for one theater's fetch: reads the loaded entries, keeps its
+        own updates until absorb(), so a fetch that is given up on can't
+        leave any behind."""
+        return FetchCache(self.entries, self.strategies, self.shards)
+
+    def absorb(self, child: "FetchCache"):
+        self.updated.update(child.updated)
+        self.updated_strategies.update(child.updated_strategies)
+        self.updated_shards.update(child.updated_shards)
+
+    def shard(self, market: str, start: str) -> Tuple[Optional[datetime], Optional[Calendar]]:
+        """When a date window was last fetched, and what it held."""
+        fetched, payload = self.updated_shards.get((market, start)) or self.shards.get((market, start)) or (None, None)
+        if payload is None:
+            return None, None
+        return datetime.fromisoformat(fetched), calendar_from_cache(payload)
+
+    def record_shard(self, market: str, start: str, cal: Calendar):
+        self.updated_shards[(market, start)] = (datetime.now().isoformat(timespec="seconds"), calendar_to_cache(cal))
+
+    def strategy(self, market: str) -> str:
+        return self.updated_strategies.get(market) or self.strategies.get(market, "")
+
+    def record_strategy(self, market: str, name: str):
+        if self.strategy(market) != name:
+            self.updated_strategies[market] = name
+
+    def get(self, url: str) -> dict:
+        return self.entries.get(url, {})
+
+    def record(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+               digest: Optional[str] = None):
+        self.updated[url] = {"etag": etag, "last_modified": last_modified, "hash": digest}
+
+
+def payload_digest(body: bytes, html: bool = False) -> str:
+    """sha256 of a payload. For HTML only the calendar tables count, so
+    per-request noise elsewhere in the page (tokens, timestamps) is ignored."""
+    if html:
+        start, end = body.find(b"<table"), body.rfind(b"</table>")
+        if start != -1 and end > start:
+            body = body[start:end]
+    return hashlib.sha256(body).hexdigest()
+
+
+def reads_tables(market: str, fetch_cache: Optional[FetchCache]) -> bool:
+    """Whether the market's extraction reads nothing but the calendar tables,
+    so their hash stands for the result. Other strategies read scripts and
+    links elsewhere in the page; for those the extracted calendar is hashed."""
+    return fetch_cache is not None and fetch_cache.strategy(market) == "table"
+
+
+def http_fetch(url: str, accept: str = "*/*", validators: Optional[dict] = None,
+               extra_headers: Optional[dict] = None):
+    """GET with optional conditional headers; returns (body or None on 304, headers)."""
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Accept": accept,
+        "Accept-Encoding": "gzip",
+        **(extra_headers or {}),
+    }
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    req = urllib.request.Request(url, headers=headers)
     try:
-        with open(CACHE_FILE) as f:
-            return set(json.load(f))
-    except:
-        return set()
+        with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as resp:
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return body, resp.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, e.headers
+        raise
 
 
-def save_cache(titles: Set[str]):
-    with open(CACHE_FILE, "w") as f:
-        json.dump(sorted(titles), f, indent=2)
+def http_get(url: str, accept: str = "*/*") -> bytes:
+    return http_fetch(url, accept)[0]
 
 
-def send_email(new: List[str]):
-    if not EMAIL_ENABLED or not all([EMAIL_TO, EMAIL_FROM, EMAIL_PASS]):
-        return
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
+PAGING_FLAGS = ("hasMore", "hasNextPage", "has_more", "moreAvailable")
+PAGING_NEXT = ("nextPage", "next", "nextCursor", "next_page")
+PAGING_SECTIONS = ("meta", "pagination", "pageInfo", "paging")
+
+
+def more_pages(data) -> Optional[bool]:
+    """Whether a paged API response says more pages follow; None if it doesn't say."""
+    if not isinstance(data, dict):
+        return None
+    for node in [data] + [data[k] for k in PAGING_SECTIONS if isinstance(data.get(k), dict)]:
+        for k in PAGING_FLAGS:
+            if isinstance(node.get(k), bool):
+                return node[k]
+        for k in PAGING_NEXT:
+            if k in node:
+                return bool(node[k])
+        page = node.get("page") or node.get("currentPage")
+        pages = node.get("pageCount") or node.get("totalPages") or node.get("lastPage")
+        if isinstance(page, int) and isinstance(pages, int):
+            return page < pages
+    return None
+
 
-    msg = MIMEMultipart()
-    msg["From"] = EMAIL_FROM
-    msg["To"] = EMAIL_TO
-    msg["Subject"] = f"NEW MOVIE: {', '.join(new)}"
-    body = "New in Austin:\n\n" + "\n".join(f"• {t}" for t in new) + f"\n\n{URL}"
-    msg.attach(MIMEText(body, "plain"))
+PAGE_PARAMS = ("page", "pageNumber", "page_number", "p")
+OFFSET_PARAMS = ("offset", "start", "skip")
+LIMIT_PARAMS = ("limit", "pageSize", "page_size", "perPage", "per_page", "size")
+TOTAL_PAGES_KEYS = ("pageCount", "totalPages", "lastPage")
+TOTAL_ITEMS_KEYS = ("total", "totalCount", "totalItems", "total_count")
 
+
+def paging_value(data, keys) -> Optional[int]:
+    if not isinstance(data, dict):
+        return None
+    for node in [data] + [data[k] for k in PAGING_SECTIONS if isinstance(data.get(k), dict)]:
+        for k in keys:
+            if isinstance(node.get(k), int) and not isinstance(node.get(k), bool):
+                return node[k]
+    return None
+
+
+class Pagination:
+    """How to ask a paged API for the pages after one it has answered: a
+    query parameter stepped from that request's value. `left` is the number
+    of pages still to fetch when the response says, else None."""
+
+    def __init__(self, url: str, param: str, value: int, step: int, left: Optional[int] = None):
+        self.base = url
+        self.param = param
+        self.value = value
+        self.step = step
+        self.left = left
+
+    def url(self, k: int) -> str:
+        """URL of the k-th page after the known one."""
+        parts = urllib.parse.urlsplit(self.base)
+        query = [(n, v) for n, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if n != self.param]
+        query.append((self.param, str(self.value + k * self.step)))
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+    @classmethod
+    def discover(cls, urls: List[str], data) -> Optional["Pagination"]:
+        """From the request URLs seen so far (oldest first) and the last one's
+        response. With two requests the parameter that moved wins, by
+        however much it moved; with one, a page number steps by 1 and an
+        offset by its limit parameter."""
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(urls[-1]).query))
+        prev = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(urls[-2]).query)) if len(urls) > 1 else None
+        # Named paging parameters first, so a numeric cache-buster can't win
+        for name in sorted(query, key=lambda n: n not in PAGE_PARAMS + OFFSET_PARAMS):
+            value = query[name]
+            if not value.isdigit():
+                continue
+            if prev is not None:
+                before = prev.get(name, "1" if name in PAGE_PARAMS else "0")
+                step = int(value) - int(before) if before.isdigit() else 0
+            elif name in PAGE_PARAMS:
+                step = 1
+            elif name in OFFSET_PARAMS:
+                step = next((int(query[k]) for k in LIMIT_PARAMS if query.get(k, "").isdigit()), 0)
+            else:
+                continue
+            if step <= 0:
+                continue
+            # current = pages fetched so far, counting this one
+            if name in PAGE_PARAMS or (name not in OFFSET_PARAMS and step == 1):
+                # Numbering is zero-based if page 0 was requested or reported
+                reported = paging_value(data, ("page", "currentPage"))
+                zero = 0 in (int(value), reported) or (prev or {}).get(name) == "0"
+                current = int(value) + 1 if zero else int(value)
+            else:
+                current = int(value) // step + 1
+            total = paging_value(data, TOTAL_PAGES_KEYS)
+            items = paging_value(data, TOTAL_ITEMS_KEYS)
+            if total is None and items is not None and name in OFFSET_PARAMS:
+                total = -(-items // step)
+            left = max(0, total - current) if total is not None else None
+            return cls(urls[-1], name, int(value), step, left)
+        return None
+
+
+def fetch_pages(plan: Pagination, headers: Optional[dict] = None) -> list:
+    """Decoded JSON of the pages after the known one. With a known page
+    count they are all requested at once, at most PAGE_FETCH_WORKERS in
+    flight; otherwise in waves of that size until a page says it's the last."""
+    def fetch(k):
+        return json.loads(http_fetch(plan.url(k), "application/json", extra_headers=headers)[0])
+
+    limit = HARVEST_MAX_STEPS if plan.left is None else min(plan.left, HARVEST_MAX_STEPS)
+    pages: list = []
+    with ThreadPoolExecutor(max(1, PAGE_FETCH_WORKERS)) as pool:
+        if plan.left is not None:
+            return list(pool.map(fetch, range(1, limit + 1)))
+        while len(pages) < limit:
+            first = len(pages) + 1
+            for data in pool.map(fetch, range(first, min(first + PAGE_FETCH_WORKERS, limit + 1))):
+                pages.append(data)
+                if more_pages(data) is not True:
+                    return pages
+    return pages
+
+
+def paginate(market: str, urls: List[str], data, headers: Optional[dict] = None) -> Optional[list]:
+    """The remaining pages of a paged API, or None when its paging parameter
+    can't be worked out or a page fails (callers fall back to clicking)."""
+    plan = Pagination.discover(urls, data)
+    if plan is None:
+        log.info(f"[{market}] API says more pages follow, but no paging parameter in {urls[-1]}")
+        return None
     try:
-        s = smtplib.SMTP(*EMAIL_SMTP.split(":"))
-        s.starttls()
-        s.login(EMAIL_FROM, EMAIL_PASS)
-        s.sendmail(EMAIL_FROM, EMAIL_TO, msg.as_string())
-        s.quit()
-        log.info("Email sent")
+        with phase("paginate", market) as rec:
+            start = time.monotonic()
+            pages = fetch_pages(plan, headers)
+            secs = time.monotonic() - start
+            if rec is not None:
+                rec.update(pages=len(pages), param=plan.param, pages_per_s=round(len(pages) / secs, 1) if secs else None)
     except Exception as e:
-        log.error(f"Email failed: {e}")
+        log.warning(f"[{market}] Page prefetch via {plan.param}= failed: {e}")
+        return None
+    log.info(
+        f"[{market}] Pagination via {plan.param}= (step {plan.step}): {len(pages)} more page(s) in {secs:.2f}s"
+        + (f" ({len(pages) / secs:.1f} pages/s)" if secs else "")
+    )
+    return pages
 
 
-def main():
-    log.info("=== Alamo New Movie Check ===")
-    current = fetch_movie_titles()
-    prev = load_cache()
-    new = sorted(current - prev)
+def api_payload(market: str, url: str, body: bytes) -> bytes:
+    """`body`, or when it is page one of a paged API, every page as one JSON array."""
+    data = json.loads(body)
+    pages = paginate(market, [url], data) if more_pages(data) else None
+    return json.dumps([data] + pages).encode() if pages else body
 
-    if new:
-        log.info(f"NEW: {', '.join(new)}")
-        send_email(new)
-    else:
-        log.info("No new movies")
 
-    save_cache(current)
-    log.info("Done\n")
+SESSION_TIME_KEYS = ("showTimeClt", "showTime", "startsAt", "startTime", "sessionDateTime", "startDate")
+SESSION_FILM_KEYS = ("presentationSlug", "filmSlug", "movieSlug")
+SESSION_FORMAT_KEYS = ("format", "formatName", "videoFormat")
+
+
+@lru_cache(maxsize=4096)
+def showtime_from_iso(value) -> Optional[Tuple[str, str]]:
+    """("2025-11-03", "7:00PM") from a local ISO datetime: the calendar table's notation."""
+    if not isinstance(value, str) or len(value) <= 10:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt.date().isoformat(), dt.strftime("%I:%M%p").lstrip("0")
+
+
+def session_on_sale(node: dict) -> bool:
+    offers = node.get("offers")
+    status = node.get("status") or node.get("availability") or (offers.get("availability") if isinstance(offers, dict) else "")
+    return "sold" not in str(status or "").lower()
+
+
+def calendar_from_json(data) -> Calendar:
+    """Walk an API or app-state payload and pick up films and showtimes.
+
+    The schedule data nests films under presentations/shows; rather than
+    pin the exact shape, a film is any object with a slug and a title (its
+    own or its "show"'s), and a showing any object with a start datetime
+    and a film slug reference.
+    """
+    cal = Calendar(showings=set())
+    sessions = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            start = next((node[k] for k in SESSION_TIME_KEYS if isinstance(node.get(k), str)), None)
+            ref = next((node[k] for k in SESSION_FILM_KEYS if isinstance(node.get(k), str)), None)
+            if start and ref:
+                sessions.append((ref, start, node))
+            else:
+                title, show = node.get("title"), node.get("show")
+                if not isinstance(title, str) and isinstance(show, dict):
+                    title = show.get("title")
+                slug = node.get("slug") or node.get("filmSlug")
+                if isinstance(title, str) and isinstance(slug, str):
+                    cal.add_film(f"/film/{slug}", title.strip())
+            # document order, so the first duplicate wins
+            stack.extend(v for v in reversed(list(node.values())) if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in reversed(node) if isinstance(v, (dict, list)))
+    for ref, start, node in sessions:
+        when = showtime_from_iso(start)
+        if when and ref in cal.films:
+            fmt = next((str(node[k]) for k in SESSION_FORMAT_KEYS if node.get(k)), "")
+            cal.showings.add(Showing(ref, *when, fmt, session_on_sale(node)))
+    if not cal.showings:
+        cal.showings = None
+    return cal
+
+
+def calendar_from_html(html) -> Calendar:
+    return html_extractor()(html)
+
+
+def fetch_calendar_http(market: str, url: str, fetch_cache: Optional[FetchCache] = None, api: bool = True) -> Calendar:
+    """Fetch without a browser: schedule API first, then the page HTML.
+
+    With a FetchCache the request is conditional, and a 304 or a payload
+    identical to the last processed one returns an `unchanged` Calendar
+    without parsing.
+    """
+    cal = Calendar()
+    sources = (
+        ("api", API_URL.format(market=market) if api else "", "application/json",
+         lambda b: calendar_from_json(json.loads(b))),
+        # With a browser to fall back to, bare /film/ links don't make a calendar
+        ("html", url, "text/html", lambda b: extract_ranked(b, market, fetch_cache, cards=FETCH_MODE != "auto")),
+    )
+    for kind, url, accept, parse in sources:
+        if not url:
+            continue
+        try:
+            log.info(f"HTTP GET: {url}")
+            known = fetch_cache.get(url) if fetch_cache else {}
+            with phase(f"http_{kind}", market):
+                body, headers = http_fetch(url, accept, known)
+            if body is None:
+                log.info(f"[{market}] 304 Not Modified; short-circuiting")
+                return Calendar(unchanged=True)
+            if kind == "api":
+                first, body = body, api_payload(market, url, body)
+                if body is not first:
+                    # Page one's validators say nothing about the later pages
+                    headers = {}
+            digest = payload_digest(body, html=kind == "html")
+            if (kind == "api" or reads_tables(market, fetch_cache)) and known.get("hash") == digest:
+                log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+                return Calendar(unchanged=True)
+            with phase(f"parse_{kind}", market):
+                cal = parse(body)
+            # The table span only covers the table strategy (whichever won this time)
+            if kind == "html" and not reads_tables(market, fetch_cache):
+                digest = calendar_digest(cal)
+                if cal and known.get("hash") == digest:
+                    log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+                    return Calendar(unchanged=True)
+            if fetch_cache is not None and cal:
+                fetch_cache.record(url, headers.get("ETag"), headers.get("Last-Modified"), digest)
+        except Exception as e:
+            log.warning(f"HTTP fetch failed for {url}: {e}")
+            continue
+        if cal:
+            break
+    log_titles(cal.titles, market)
+    return cal
+
+
+# === STRATEGIES ===
+# Ranked ways to find films in a page, cheapest first. Each has the CSS
+# marker that tells the browser engine its markup is present. The last
+# winner per market is tried first next run.
+SCRIPT_OPEN_RE = re.compile(r"<script\b([^>]*)>\s*", re.I)
+STATE_ASSIGN_RE = re.compile(r"window\.__\w+__\s*=\s*")
+_json_decoder = json.JSONDecoder()
+
+
+def _json_blocks(html, kind: str):
+    """Decode inline JSON <script>s in place: ld+json blocks for "jsonld";
+    Next.js data, other application/json blocks and window.__X__ = {...}
+    for "state". raw_decode reads straight out of the page string, so a
+    large blob is neither copied out nor scanned for </script> first."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    pos = 0
+    while True:
+        m = SCRIPT_OPEN_RE.search(html, pos)
+        if not m:
+            return
+        attrs, pos = m.group(1), m.end()
+        if "ld+json" in attrs:
+            found = kind == "jsonld"
+        elif "application/json" in attrs or "__NEXT_DATA__" in attrs:
+            found = kind == "state"
+        else:
+            a = STATE_ASSIGN_RE.match(html, pos) if kind == "state" and "src=" not in attrs else None
+            found = a is not None
+            if a:
+                pos = a.end()
+        if not found:
+            continue
+        try:
+            data, pos = _json_decoder.raw_decode(html, pos)
+        except ValueError:
+            continue
+        yield data
+
+
+def extract_table(html) -> Calendar:
+    return calendar_from_html(html)
+
+
+def extract_jsonld(html) -> Calendar:
+    """schema.org Movie blocks that link to a /film/ page, and ScreeningEvents
+    (startDate, videoFormat, offers.availability) presenting one."""
+    cal = Calendar(showings=set())
+    stack = list(_json_blocks(html, "jsonld"))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            url, name = node.get("url") or node.get("@id") or "", node.get("name")
+            if isinstance(name, str) and isinstance(url, str) and "/film/" in url:
+                cal.add_film(url, name.strip())
+            types = node.get("@type")
+            work = node.get("workPresented")
+            if "ScreeningEvent" in (types if isinstance(types, list) else [types]) and isinstance(work, dict):
+                start = node.get("startDate")
+                when = showtime_from_iso(start) if isinstance(start, str) else None
+                slug = cal.add_film(work.get("url") or "", str(work.get("name") or "").strip())
+                if when and slug:
+                    cal.showings.add(Showing(slug, *when, str(node.get("videoFormat") or ""), session_on_sale(node)))
+            stack.extend(v for v in reversed(list(node.values())) if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in reversed(node) if isinstance(v, (dict, list)))
+    if not cal.showings:
+        cal.showings = None
+    return cal
+
+
+def extract_state(html) -> Calendar:
+    cal = Calendar(showings=set())
+    for data in _json_blocks(html, "state"):
+        part = calendar_from_json(data)
+        cal.films.update(part.films)
+        cal.showings |= part.showings or set()
+    if not cal.showings:
+        cal.showings = None
+    return cal
+
+
+def extract_cards(html) -> Calendar:
+    """Any /film/ link outside the page chrome, titled by its text, img alt or label."""
+    cal = Calendar()
+    if lxml_html is not None:
+        root = lxml_html.fromstring(html) if html else None
+        links = root.xpath("//a[contains(@href,'/film/')][not(ancestor::nav or ancestor::header or ancestor::footer)]") if root is not None else []
+        for a in links:
+            title = "".join(t.strip() for t in a.itertext()) or a.get("aria-label") or a.get("title") \
+                or next((img.get("alt") for img in a.iter("img") if img.get("alt")), "")
+            cal.add_film(a.get("href", ""), title.strip())
+        return cal
+    for a in BeautifulSoup(html, "html.parser").select("a[href*='/film/']"):
+        if a.find_parent(["nav", "header", "footer"]):
+            continue
+        img = a.find("img", alt=True)
+        title = a.get_text(strip=True) or a.get("aria-label") or a.get("title") or (img["alt"] if img else "")
+        cal.add_film(a.get("href", ""), title.strip())
+    return cal
+
+
+# name -> (browser readiness marker, substrings that must be in the HTML, extractor over page HTML).
+# The embedded-JSON ones carry the whole schedule and need no scrolling.
+STRATEGIES = {
+    "state": ("script#__NEXT_DATA__, script[type='application/json']",
+              ("__NEXT_DATA__", "application/json", "window.__"), extract_state),
+    "jsonld": ("script[type='application/ld+json']", ("application/ld+json",), extract_jsonld),
+    "table": ("table td a[href*='/film/']", ("<table",), extract_table),
+    "cards": ("a[href*='/film/']", ("/film/",), extract_cards),
+}
+# Any JSON blob can hold objects with a slug and a title (venues, nav
+# pages), so these only count when they also carry showtimes.
+SCHEDULE_STRATEGIES = ("state", "jsonld")
+
+
+def strategy_order(market: str, fetch_cache: Optional[FetchCache] = None, available=None) -> List[str]:
+    """Rank order, restricted to `available`, with last run's winner first
+    (so strategies that came up empty then aren't paid for again). The
+    titles-only "cards" catch-all is never promoted over richer markup."""
+    names = [n for n in STRATEGIES if available is None or n in available]
+    preferred = fetch_cache.strategy(market) if fetch_cache else ""
+    if preferred in names and preferred != "cards":
+        names.remove(preferred)
+        names.insert(0, preferred)
+    return names
+
+
+def probe_strategies(html) -> List[str]:
+    """Strategies whose markup is in the page at all: a substring check, far cheaper than a parse."""
+    text = html.decode("utf-8", "replace") if isinstance(html, bytes) else html or ""
+    return [name for name, (_, needles, _) in STRATEGIES.items() if any(n in text for n in needles)]
+
+
+def extract_ranked(html, market: str, fetch_cache: Optional[FetchCache] = None, cards: bool = True) -> Calendar:
+    """Try each strategy present in the page until one finds films (and, for
+    embedded JSON, showtimes); remember the winner.
+
+    `cards=False` leaves out the bare-link catch-all, for callers that can
+    still render the page: static HTML of a JS-built calendar often holds
+    only a hero carousel's worth of /film/ links.
+    """
+    names = strategy_order(market, fetch_cache, [n for n in probe_strategies(html) if cards or n != "cards"])
+    for name in names:
+        with phase(f"strategy_{name}", market):
+            try:
+                cal = STRATEGIES[name][2](html)
+            except Exception as e:
+                log.warning(f"[{market}] Strategy {name} failed: {e}")
+                continue
+        if cal and name in SCHEDULE_STRATEGIES and not cal.showings:
+            log.debug(f"[{market}] Strategy {name} found {len(cal.films)} film(s) but no showtimes; ignoring it")
+            continue
+        if cal:
+            if name != names[0]:
+                # Only news if last run's winner stopped working
+                cached = fetch_cache is not None and fetch_cache.strategy(market) == names[0]
+                log.log(logging.WARNING if cached else logging.INFO,
+                        f"[{market}] Strategy {names[0]} found nothing; fell back to {name}")
+            note_strategy(market, name, fetch_cache)
+            return cal
+    if not cards:
+        log.info(f"[{market}] No calendar markup in the static HTML (tried {', '.join(names) or 'none'})")
+        return Calendar()
+    log.error(
+        f"[{market}] No extraction strategy found films (tried {', '.join(names) or 'none, no known markup'});"
+        " page layout may have changed"
+    )
+    note_strategy(market, "", None)
+    return Calendar()
+
+
+def note_strategy(market: str, name: str, fetch_cache: Optional[FetchCache] = None):
+    if fetch_cache is not None and name:
+        fetch_cache.record_strategy(market, name)
+    if _metrics:
+        _metrics.extra.setdefault("strategy", {})[market] = name or None
+
+
+# === SELENIUM ENGINE ===
+TABLES_HTML_JS = "return Array.from(document.querySelectorAll('table'), t => t.outerHTML).join('');"
+
+
+def capture_debug(driver, market: str, kind: str = "crash"):
+    """Save {kind}_{market}_{ts}.html.gz (+ .png) into CAPTURE_DIR and prune
+    old captures. Never raises: a capture must not mask the real failure."""
+    stem = os.path.join(CAPTURE_DIR, f"{kind}_{market}_{time.strftime('%Y%m%d-%H%M%S')}")
+    try:
+        with phase("capture_dom", market) as rec:
+            html = driver.execute_script(TABLES_HTML_JS) or driver.page_source
+            data = gzip.compress(html.encode(), compresslevel=6)
+            with open(stem + ".html.gz", "wb") as f:
+                f.write(data)
+            if rec is not None:
+                rec["bytes"] = len(data)
+        msg = f"{stem}.html.gz ({len(data) / 1024:.0f} KB, {len(html) / 1024:.0f} KB raw)"
+        if CAPTURE_SCREENSHOT:
+            with phase("capture_png", market) as rec:
+                driver.save_screenshot(stem + ".png")
+                if rec is not None:
+                    rec["bytes"] = os.path.getsize(stem + ".png")
+            msg += f" + {stem}.png ({os.path.getsize(stem + '.png') / 1024:.0f} KB)"
+        log.info(f"[{market}] Captured {msg}")
+    except Exception as e:
+        log.warning(f"[{market}] Debug capture failed: {e}")
+    prune_captures()
+
+
+def prune_captures(directory: str = CAPTURE_DIR, keep: int = CAPTURE_KEEP):
+    """Keep the newest `keep` captures (a capture is every file sharing a stem)."""
+    stems: Dict[str, List[str]] = {}
+    for name in os.listdir(directory):
+        if name.startswith(("crash_", "debug_")) and name.endswith((".html.gz", ".png")):
+            stems.setdefault(name.split(".", 1)[0], []).append(os.path.join(directory, name))
+    newest = sorted(stems, key=lambda st: max(os.path.getmtime(p) for p in stems[st]), reverse=True)
+    for stem in newest[keep:]:
+        for path in stems[stem]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class Harvest:
+    """Running Calendar fed by JS_HARVEST after every page step.
+
+    Rows survive even if a virtualized grid later drops them from the DOM,
+    and each step's yield (new films / showings) decides whether to go on.
+    """
+
+    def __init__(self, market: str):
+        self.market = market
+        self.cal = Calendar(showings=set())
+        self.yields: List[Tuple[str, int, int]] = []
+
+    def step(self, driver, name: str) -> int:
+        films, showings = len(self.cal.films), len(self.cal.showings)
+        with phase("harvest_step", self.market) as rec:
+            rows = driver.execute_script(JS_HARVEST)
+            add_rows(self.cal, rows)
+            new_films, new_showings = len(self.cal.films) - films, len(self.cal.showings) - showings
+            if rec is not None:
+                rec.update(step=name, rows=len(rows), new_films=new_films, new_showings=new_showings)
+        self.yields.append((name, new_films, new_showings))
+        log.debug(f"[{self.market}] Harvest {name}: {len(rows)} row(s), +{new_films} film(s), +{new_showings} showing(s)")
+        return new_films + new_showings
+
+    def result(self) -> Calendar:
+        log.info(
+            f"[{self.market}] Harvested {len(self.cal.films)} film(s), {len(self.cal.showings)} showing(s)"
+            f" in {len(self.yields)} step(s): " + ", ".join(f"{n} +{f}/+{s}" for n, f, s in self.yields)
+        )
+        cal, self.cal = self.cal, Calendar(showings=set())
+        if not cal.showings:
+            cal.showings = None
+        return cal
+
+
+def harvest_calendar(driver, market: str) -> Calendar:
+    """Load More until a click adds nothing, then scroll a viewport at a
+    time until a step adds nothing, extracting after every step."""
+    harvest = Harvest(market)
+    harvest.step(driver, "initial")
+    settled = lambda d: dom_quiet()(d) and network_idle()(d)  # noqa: E731
+
+    for n in range(1, HARVEST_MAX_STEPS + 1):
+        try:
+            btn = driver.find_element(By.XPATH, "//button[contains(., 'Load More')]")
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", btn)
+        except NoSuchElementException:
+            break
+        except Exception as e:
+            log.warning(f"Load More failed: {e}")
+            break
+        wait_phase(driver, f"load_more {n}", settled, LOAD_MORE_TIMEOUT, level=logging.DEBUG)
+        if not harvest.step(driver, f"load_more {n}"):
+            log.info("Load More added nothing new, stopping")
+            break
+
+    for n in range(1, HARVEST_MAX_STEPS + 1):
+        driver.execute_script("window.scrollBy(0, window.innerHeight);")
+        wait_phase(driver, f"scroll {n}", settled, SCROLL_SETTLE_TIMEOUT, level=logging.DEBUG)
+        if not harvest.step(driver, f"scroll {n}"):
+            break
+    return harvest.result()
+
+
+class XhrCapture:
+    """Schedule JSON read back from Chrome's network log as the page fetches it.
+
+    Every drained event is kept in `events` so the run's network accounting
+    still sees them. `more` is the last matching response's paging verdict.
+    """
+
+    def __init__(self, market: str, patterns: List[str] = XHR_URL_PATTERNS):
+        self.market = market
+        self.patterns = patterns
+        self.events: List[dict] = []
+        self.pending: Dict[str, str] = {}
+        self.urls: List[str] = []
+        self.bodies: list = []
+        self.bytes = 0
+        self.more: Optional[bool] = None
+        self.cal = Calendar()
+
+    def poll(self, driver) -> int:
+        """Read the bodies of matching responses finished since the last poll; returns how many."""
+        events = drain_network_log(driver)
+        self.events += events
+        n = 0
+        for ev in events:
+            params = ev["params"]
+            if ev["method"] == "Network.responseReceived":
+                resp = params["response"]
+                if ("json" in resp.get("mimeType", "") and resp.get("status") == 200
+                        and any(p in resp["url"] for p in self.patterns)):
+                    self.pending[params["requestId"]] = resp["url"]
+            elif ev["method"] == "Network.loadingFinished" and params["requestId"] in self.pending:
+                url = self.pending.pop(params["requestId"])
+                try:
+                    got = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                    body = base64.b64decode(got["body"]) if got.get("base64Encoded") else got["body"]
+                    data = json.loads(body)
+                except (WebDriverException, ValueError, KeyError) as e:
+                    log.debug(f"[{self.market}] Skipping XHR body {url}: {e}")
+                    continue
+                self.bytes += len(body)
+                self.urls.append(url)
+                self.bodies.append(data)
+                self.more = more_pages(data)
+                log.debug(f"[{self.market}] XHR {url}: {len(body) / 1024:.0f} KB, more={self.more}")
+                n += 1
+        if n:
+            # Sessions may reference films from an earlier page, so walk them all together
+            self.cal = calendar_from_json(self.bodies)
+        return n
+
+    def add(self, pages: list):
+        """Pages fetched outside the browser."""
+        self.bodies += pages
+        self.more = more_pages(pages[-1]) if pages else False
+        self.cal = calendar_from_json(self.bodies)
+
+    def size(self) -> int:
+        return len(self.cal.films) + len(self.cal.showings or ())
+
+
+def browser_headers(driver) -> dict:
+    """The page's cookies, for replaying its API requests outside the browser."""
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+    return {"Cookie": cookies} if cookies else {}
+
+
+def capture_calendar(driver, market: str, capture: XhrCapture) -> Calendar:
+    """Fetch the rest of a paged schedule API directly once its paging
+    parameter is known. Failing that, page through it by clicking Load More
+    (or scrolling when there is no button) until a response says there are
+    no more pages or a step brings nothing new."""
+    if capture.more:
+        pages = paginate(market, capture.urls, capture.bodies[-1], browser_headers(driver))
+        if pages is not None:
+            capture.add(pages)
+            return capture.cal
+    settled = lambda d: dom_quiet()(d) and network_idle()(d)  # noqa: E731
+    start, steps = time.monotonic(), 0
+    while capture.more is not False and steps < HARVEST_MAX_STEPS:
+        before, steps = capture.size(), steps + 1
+        try:
+            btn = driver.find_element(By.XPATH, "//button[contains(., 'Load More')]")
+            if not btn.is_displayed():
+                raise NoSuchElementException("Load More hidden")
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", btn)
+            name, budget = f"load_more {steps}", LOAD_MORE_TIMEOUT
+        except NoSuchElementException:
+            driver.execute_script("window.scrollBy(0, window.innerHeight);")
+            name, budget = f"scroll {steps}", SCROLL_SETTLE_TIMEOUT
+        wait_phase(driver, name, settled, budget, level=logging.DEBUG)
+        if not capture.poll(driver) or capture.size() == before:
+            log.info(f"[{market}] {name} brought no new schedule data, stopping")
+            break
+    cal, secs = capture.cal, time.monotonic() - start
+    log.info(
+        f"[{market}] Schedule from {len(capture.bodies)} XHR response(s) ({capture.bytes / 1024:.0f} KB)"
+        f" after {steps} step(s) in {secs:.2f}s: {len(cal.films)} film(s), {len(cal.showings or ())} showing(s)"
+        + ("; API reports no more pages" if capture.more is False else "")
+    )
+    return cal
+
+
+def fetch_calendar_selenium(market: str, url: str, warm: Optional[WarmDriver] = None,
+                            fetch_cache: Optional[FetchCache] = None) -> Calendar:
+    driver = None
+    watchdog = None
+    cal = Calendar()
+    capture = XhrCapture(market)
+    try:
+        with phase("get_driver", market):
+            driver = warm.get() if warm else get_driver()
+        watchdog = MemoryWatchdog(driver, market).start()
+        drain_network_log(driver)  # drop anything left over from a previous poll
+        log.info(f"Loading: {url}")
+        with phase("page_load", market):
+            driver.get(url)
+            install_watchers(driver)
+            idle = wait_phase(driver, "network_idle", network_idle(), PAGE_READY_TIMEOUT)
+
+        if XHR_CAPTURE:
+            with phase("xhr_capture", market) as rec:
+                if capture.poll(driver):
+                    cal = capture_calendar(driver, market, capture)
+                if rec is not None:
+                    rec.update(responses=len(capture.bodies), bytes=capture.bytes)
+            # Titles-only or unrelated JSON: the page itself is the better source
+            if cal and cal.showings:
+                note_strategy(market, "xhr", fetch_cache)
+                return finish_selenium(driver, market, url, cal, fetch_cache, capture.events)
+            cal = Calendar()
+
+        with phase("wait_calendar", market):
+            present = wait_for_calendar(driver, idle)
+        embedded = embedded_calendar(driver, market, present, fetch_cache)
+        if embedded:
+            return finish_selenium(driver, market, url, embedded, fetch_cache, capture.events)
+        table = "table" in present
+        if HARVEST and table and strategy_order(market, fetch_cache, present)[0] == "table":
+            return harvest_selenium(driver, market, url, fetch_cache, capture.events)
+        with phase("load_more", market):
+            click_load_more(driver)
+        with phase("scroll", market):
+            scroll_gently(driver)
+
+        # Final wait for cells
+        if table:
+            with phase("wait_cells", market):
+                if not wait_phase(driver, "cells", lambda d: link_count(d) > 0 and dom_quiet()(d), PAGE_READY_TIMEOUT):
+                    raise TimeoutException("Calendar cells never filled in")
+
+        if CAPTURE_POLICY == "always":
+            capture_debug(driver, market, "debug")
+
+        # The browser can't do conditional requests for us, but the rendered
+        # tables can still be compared with the last processed ones
+        digest = None
+        if reads_tables(market, fetch_cache):
+            with phase("table_hash", market):
+                digest = payload_digest(driver.execute_script(TABLES_HTML_JS).encode())
+            if fetch_cache.get(url + "#tables").get("hash") == digest:
+                log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+                log_network_usage(driver, market, capture.events)
+                return Calendar(unchanged=True)
+
+        if EXTRACTOR == "js" and table:
+            with phase("extract_js", market):
+                cal = extract_js(driver)
+            note_strategy(market, "table", fetch_cache)
+        else:
+            with phase("page_source", market):
+                html = driver.page_source
+            with phase("parse", market):
+                cal = extract_ranked(html, market, fetch_cache)
+        log_network_usage(driver, market, capture.events)
+        if fetch_cache is not None and cal:
+            if not reads_tables(market, fetch_cache):
+                digest = calendar_digest(cal)
+            elif digest is None:
+                digest = payload_digest(driver.execute_script(TABLES_HTML_JS).encode())
+            if fetch_cache.get(url + "#tables").get("hash") == digest:
+                log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+                return Calendar(unchanged=True)
+            fetch_cache.record(url + "#tables", digest=digest)
+        log_titles(cal.titles, market)
+        return cal
+
+    except Exception as e:
+        log.error(f"[{market}] SCRAPING FAILED: {e}")
+        if driver and CAPTURE_POLICY != "off" and not (watchdog and watchdog.tripped):
+            capture_debug(driver, market, "crash")
+        if warm:
+            warm.recycle("memory watchdog" if watchdog and watchdog.tripped else "scrape failed")
+            driver = None
+        return cal
+    finally:
+        if watchdog:
+            watchdog.stop()
+            log.info(
+                f"[{market}] Chrome peak RSS {watchdog.peak / 1e6:.0f} MB"
+                f" ({'low-memory' if CHROME_LOW_MEMORY else 'default'} profile)"
+            )
+        if driver and not warm:
+            driver.quit()
+
+
+def harvest_selenium(driver, market: str, url: str, fetch_cache: Optional[FetchCache] = None,
+                     seen: Optional[List[dict]] = None) -> Calendar:
+    with phase("wait_cells", market):
+        wait_phase(driver, "cells", dom_quiet(), PAGE_READY_TIMEOUT)
+    with phase("harvest", market):
+        cal = harvest_calendar(driver, market)
+    if not cal:
+        raise TimeoutException("Calendar cells never filled in")
+    note_strategy(market, "table", fetch_cache)
+    return finish_selenium(driver, market, url, cal, fetch_cache, seen)
+
+
+EMBEDDED_SCRIPTS_JS = "return Array.from(document.querySelectorAll('script:not([src])'), s => s.outerHTML).join('');"
+
+
+def embedded_calendar(driver, market: str, present: List[str], fetch_cache: Optional[FetchCache] = None) -> Calendar:
+    """The schedule from embedded JSON, if the page ships it with showtimes;
+    then there is nothing to scroll or click for."""
+    names = [n for n in strategy_order(market, fetch_cache, present) if n in SCHEDULE_STRATEGIES]
+    if not names:
+        return Calendar()
+    with phase("embedded", market):
+        html = driver.execute_script(EMBEDDED_SCRIPTS_JS)
+        for name in names:
+            cal = STRATEGIES[name][2](html)
+            if cal and cal.showings:
+                log.info(f"[{market}] Schedule from embedded JSON ({name}); skipping Load More and scrolling")
+                note_strategy(market, name, fetch_cache)
+                return cal
+    return Calendar()
+
+
+def finish_selenium(driver, market: str, url: str, cal: Calendar, fetch_cache: Optional[FetchCache] = None,
+                    seen: Optional[List[dict]] = None) -> Calendar:
+    if CAPTURE_POLICY == "always":
+        capture_debug(driver, market, "debug")
+    log_network_usage(driver, market, seen)
+
+    # Already extracted, but an identical calendar can still skip diff and cache write
+    if fetch_cache is not None:
+        digest = calendar_digest(cal)
+        if fetch_cache.get(url + "#harvest").get("hash") == digest:
+            log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+            return Calendar(unchanged=True)
+        fetch_cache.record(url + "#harvest", digest=digest)
+    log_titles(cal.titles, market)
+    return cal
+
+
+def fetch_calendar(market: str = "austin", url: str = "", warm: Optional[WarmDriver] = None,
+                   fetch_cache: Optional[FetchCache] = None) -> Calendar:
+    url = url or URL_TEMPLATE.format(market=market)
+    if SHARD_DAYS > 0:
+        return fetch_sharded(market, url, warm, fetch_cache)
+    return fetch_page(market, url, warm, fetch_cache)
+
+
+def fetch_page(market: str, url: str, warm: Optional[WarmDriver] = None,
+               fetch_cache: Optional[FetchCache] = None, api: bool = True) -> Calendar:
+    if FETCH_MODE in ("http", "auto"):
+        cal = fetch_calendar_http(market, url, fetch_cache, api)
+        if cal or cal.unchanged or FETCH_MODE == "http":
+            return cal
+        log.warning(f"[{market}] HTTP fetch found no calendar, falling back to Selenium")
+    return fetch_calendar_selenium(market, url, warm, fetch_cache)
+
+
+def fetch_movie_titles(market: str = "austin", url: str = "", warm: Optional[WarmDriver] = None) -> Set[str]:
+    return fetch_calendar(market, url, warm).titles
+
+
+class DriverPool:
+    """Bounded set of WarmDrivers shared by the theater workers.
+
+    Chrome is only launched when a worker actually falls back to Selenium.
+    """
+
+    def __init__(self, size: int = MAX_WORKERS):
+        self.drivers = [WarmDriver() for _ in range(max(1, size))]
+        self.idle: "queue.Queue[WarmDriver]" = queue.Queue()
+        for warm in self.drivers:
+            self.idle.put(warm)
+
+    @contextmanager
+    def lease(self):
+        warm = self.idle.get()
+        try:
+            yield warm
+        finally:
+            self.idle.put(warm)
+
+    def close(self):
+        for warm in self.drivers:
+            warm.close()
+
+
+async def fetch_all_theaters(theaters: Dict[str, str], pool: DriverPool,
+                             fetch_cache: Optional[FetchCache] = None) -> Dict[str, Calendar]:
+    """Fetch every theater concurrently, at most MAX_WORKERS at a time.
+
+    The engines block, so each fetch runs on its own daemon thread. A
+    theater that doesn't finish inside THEATER_TIMEOUT (counted from when it
+    gets a slot) is left out of the result. Its thread can't be stopped, but
+    it writes to its own fork of `fetch_cache` that is then dropped, its
+    Chrome is recycled so it fails fast, and it can't hold the process open.
+    """
+    loop = asyncio.get_running_loop()
+
+    def settle(future: asyncio.Future, result, error):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def start(market: str, url: str, view: Optional[FetchCache], leased: list) -> asyncio.Future:
+        future = loop.create_future()
+
+        def work():
+            result, error = None, None
+            try:
+                with pool.lease() as warm:
+                    leased.append(warm)
+                    result = fetch_calendar(market, url, warm, view)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(settle, future, result, error)
+            except RuntimeError:
+                pass  # loop already gone: the theater was given up on
+        threading.Thread(target=work, name=f"theater-{market}", daemon=True).start()
+        return future
+
+    slots = asyncio.Semaphore(max(1, min(MAX_WORKERS, len(theaters))))
+
+    async def one(market: str, url: str) -> Optional[Calendar]:
+        async with slots:
+            view = fetch_cache.fork() if fetch_cache is not None else None
+            leased: list = []
+            try:
+                cal = await asyncio.wait_for(start(market, url, view, leased), THEATER_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.error(f"[{market}] timed out after {THEATER_TIMEOUT:g}s")
+                for warm in leased:
+                    threading.Thread(target=warm.recycle, args=("theater timed out",), daemon=True).start()
+                return None
+            except Exception as e:
+                log.error(f"[{market}] fetch crashed: {e}")
+                return None
+            if view is not None:
+                fetch_cache.absorb(view)
+            return cal
+
+    calendars = await asyncio.gather(*(one(m, u) for m, u in theaters.items()))
+    return {m: cal for m, cal in zip(theaters, calendars) if cal is not None}
+
+
+# === SHARDING ===
+SHARD_EPOCH = date(1970, 1, 5)  # a Monday
+
+
+def shard_windows(today: Optional[date] = None) -> List[Tuple[date, date]]:
+    """(first, last day) of SHARD_WINDOWS windows from the one holding today.
+    Windows are aligned to SHARD_EPOCH, so a window keeps its start (and its
+    cache entry) from run to run."""
+    today = today or date.today()
+    first = today - timedelta(days=(today - SHARD_EPOCH).days % SHARD_DAYS)
+    return [
+        (first + timedelta(days=i * SHARD_DAYS), first + timedelta(days=(i + 1) * SHARD_DAYS - 1))
+        for i in range(SHARD_WINDOWS)
+    ]
+
+
+def shard_url(url: str, start: date, end: date) -> str:
+    params = SHARD_PARAMS.format(start=start.isoformat(), end=end.isoformat())
+    return url + ("&" if "?" in url else "?") + params
+
+
+def fetch_sharded(market: str, url: str, warm: Optional[WarmDriver] = None,
+                  fetch_cache: Optional[FetchCache] = None, today: Optional[date] = None) -> Calendar:
+    """The calendar as date windows fetched one page each and merged, so the
+    browser never has to materialize the whole season. A window that comes
+    back unchanged, or is far enough out and recent enough, is taken from
+    the shard cache instead of being extracted again."""
+    # The schedule API is one JSON document; only the page needs sharding
+    if API_URL and FETCH_MODE != "selenium":
+        cal = fetch_calendar_http(market, "", fetch_cache)
+        if cal or cal.unchanged:
+            return cal
+
+    today = today or date.today()
+    now = datetime.now()
+    windows = shard_windows(today)
+    shards: Dict[date, Calendar] = {}
+    todo = []
+    for start, end in windows:
+        fetched, cached = fetch_cache.shard(market, start.isoformat()) if fetch_cache else (None, None)
+        far = start >= today + timedelta(days=SHARD_HOT_DAYS)
+        if cached is not None and far and now - fetched < timedelta(hours=SHARD_MAX_AGE):
+            shards[start] = cached
+        else:
+            todo.append((start, end))
+
+    def fetch(window: Tuple[date, date]) -> Calendar:
+        start, end = window
+        with phase("shard", market) as rec:
+            cal = fetch_page(market, shard_url(url, start, end), warm, fetch_cache, api=False)
+            _, cached = fetch_cache.shard(market, start.isoformat()) if fetch_cache else (None, None)
+            if cal.unchanged and cached is None:
+                # Validators without a stored shard (cache predates sharding): fetch in full
+                cal = fetch_page(market, shard_url(url, start, end), warm, None, api=False)
+            if rec is not None:
+                rec.update(start=start.isoformat(), films=len(cal.films), unchanged=cal.unchanged)
+        if cal.unchanged:
+            cal = cached
+        elif not cal:
+            # Empty may mean failed: never cache it, or a far window would be
+            # skipped for SHARD_MAX_AGE and its films expire meanwhile
+            if cached is not None:
+                log.warning(f"[{market}] Shard {start} came back empty; keeping the last fetch of it")
+                return cached
+            return cal
+        if fetch_cache is not None:
+            fetch_cache.record_shard(market, start.isoformat(), cal)
+        return cal
+
+    workers = max(1, min(SHARD_WORKERS, len(todo))) if FETCH_MODE == "http" else 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard") as pool:
+        for (start, _), cal in zip(todo, pool.map(fetch, todo)):
+            shards[start] = cal
+    log.info(
+        f"[{market}] {len(windows)} shard(s) of {SHARD_DAYS} day(s): {len(todo)} fetched, "
+        f"{len(windows) - len(todo)} from cache; "
+        + ", ".join(f"{start:%m/%d} {len(shards[start].films)}" for start, _ in windows)
+    )
+
+    cal = merge_calendars([shards[start] for start, _ in windows])
+    if not cal:
+        return cal
+    if fetch_cache is not None:
+        digest = calendar_digest(cal)
+        if fetch_cache.get(url + "#shards").get("hash") == digest:
+            log.info(f"[{market}] Calendar identical to last run; short-circuiting")
+            return Calendar(unchanged=True)
+        fetch_cache.record(url + "#shards", digest=digest)
+    log_titles(cal.titles, market)
+    return cal
+
+
+# === CACHE & ALERT ===
+class MarketState:
+    """Per-film history for one market, keyed by /film/ slug: title,
+    first_seen, last_seen, misses, alerted; plus the known showings.
+
+    Films on the calendar at the last run are tracked in `present`, the rest
+    in `missing`, so a run only touches films that appeared, vanished, are
+    still gone or were renamed. A present film's last_seen is only written
+    when it vanishes; until then it is the market's `last_run`. Touched films
+    and showings collect in `dirty` / `dirty_showings` until save_cache().
+    """
+
+    def __init__(self, records: Optional[Dict[str, dict]] = None, last_run: Optional[str] = None,
+                 showings: Optional[Dict[Tuple[str, str, str, str], bool]] = None):
+        self.records = records or {}
+        self.last_run = last_run
+        self.present = {s for s, r in self.records.items() if not r["misses"]}
+        self.missing = set(self.records) - self.present
+        self.showings = showings or {}  # Showing.key -> on_sale
+        self.dirty: Set[str] = set()
+        self.dirty_showings: Set[Tuple[str, str, str, str]] = set()
+
+    @classmethod
+    def from_titles(cls, titles, now: str) -> "MarketState":
+        """State for a pre-history cache: everything counts as already alerted."""
+        return cls({
+            slugify(t): {"title": t, "first_seen": now, "last_seen": now, "misses": 0, "alerted": True}
+            for t in titles
+        }, now)
+
+    def group_films(self, cal: Calendar, market: str = "") -> Calendar:
+        """Fold title variants ("Movie (2025)", "MOVIE: Quote-Along", a typo
+        fix) into one canonical film before diffing.
+
+        A known film's slug wins; among new variants the plainest title
+        does. Showings follow their film to the canonical slug.
+        """
+        index = TitleIndex()
+        for slug, r in self.records.items():
+            index.add(slug, r["title"])
+        canon: Dict[str, str] = {}
+        # Plainest first, so it becomes the canonical one for its group
+        for slug in sorted(cal.films, key=lambda s: (len(normalize_title(cal.films[s].title)), len(cal.films[s].title), s)):
+            if slug in self.records:
+                canon[slug] = slug
+                continue
+            match = index.match(cal.films[slug].title)
+            if match in cal.films and normalize_title(cal.films[match].title) != normalize_title(cal.films[slug].title):
+                # Both listed on this calendar under their own slugs: only an exact variant folds
+                match = None
+            canon[slug] = match or slug
+            if match is None:
+                index.add(slug, cal.films[slug].title)
+        if all(c == s for s, c in canon.items()):
+            return cal
+
+        films: Dict[str, Film] = {}
+        for slug, c in canon.items():
+            if c != slug:
+                log.info(f"[{market}] Grouped \"{cal.films[slug].title}\" under \"{self.title(c) if c in self.records else cal.films[c].title}\"")
+            if c in cal.films:
+                films[c] = cal.films[c]
+            else:
+                films.setdefault(c, Film(c, self.records[c]["title"]))
+        showings = None
+        if cal.showings is not None:
+            showings = {Showing(canon.get(sh.slug, sh.slug), sh.date, sh.time, sh.format, sh.on_sale) for sh in cal.showings}
+        return Calendar(films, showings)
+
+    def apply(self, films: Dict[str, Film], now: str) -> Tuple[List[str], Set[str]]:
+        """Fold one scrape in; return (slugs to alert, slugs whose record changed)."""
+        current = set(films)
+        changed: Set[str] = set()
+
+        for s in self.missing - current:
+            r = self.records[s]
+            r["misses"] += 1
+            if r["misses"] >= MISS_EXPIRY:
+                del self.records[s]
+                self.missing.discard(s)
+            changed.add(s)
+
+        for s in self.present - current:
+            r = self.records[s]
+            r["misses"] = 1
+            r["last_seen"] = self.last_run or now
+            self.present.discard(s)
+            self.missing.add(s)
+            changed.add(s)
+
+        new = []
+        by_title = None
+        for s in current - self.present:
+            r = self.records.get(s)
+            if r is None:
+                # A film we already know under another slug (e.g. a row migrated
+                # with a slugified title) keeps its history instead of re-alerting
+                if by_title is None:
+                    by_title = {rec["title"]: k for k, rec in self.records.items() if k not in current}
+                old = by_title.pop(films[s].title, None)
+                if old is not None:
+                    r = self.records[s] = self.records.pop(old)
+                    self.present.discard(old)
+                    self.missing.discard(old)
+                    changed.add(old)
+            if r is None:
+                r = self.records[s] = {
+                    "title": films[s].title, "first_seen": now, "last_seen": now, "misses": 0, "alerted": False,
+                }
+            else:
+                if r["misses"]:
+                    r["last_seen"] = now
+                r["misses"] = 0
+                self.missing.discard(s)
+            self.present.add(s)
+            changed.add(s)
+            if not r["alerted"]:
+                new.append(s)
+
+        # Same film, new display text: keep the slug's history, just rename
+        for s, film in films.items():
+            if self.records[s]["title"] != film.title:
+                self.records[s]["title"] = film.title
+                changed.add(s)
+
+        self.last_run = now
+        self.dirty |= changed
+        return sorted(new, key=lambda s: self.records[s]["title"]), changed
+
+    def apply_showings(self, showings: Set[Showing], skip: Set[str], today: str) -> Dict[str, List[Showing]]:
+        """Diff showings against the known set; return new showtimes, new dates and on-sale flips.
+
+        Films in `skip` (just alerted as new) and a market with no showing
+        history yet produce no events, only state. Showings dated before
+        `today` are pruned; a showing missing from one scrape is kept.
+        """
+        baseline = not self.showings
+        known_dates = {(k[0], k[1]) for k in self.showings}
+        events: Dict[str, List[Showing]] = {"showtimes": [], "dates": [], "on_sale": []}
+        new_dates = set()
+        for sh in showings:
+            prev = self.showings.get(sh.key)
+            if prev == sh.on_sale:
+                continue
+            self.showings[sh.key] = sh.on_sale
+            self.dirty_showings.add(sh.key)
+            if baseline or sh.slug in skip:
+                continue
+            if prev is None:
+                events["showtimes"].append(sh)
+                if (sh.slug, sh.date) not in known_dates and (sh.slug, sh.date) not in new_dates:
+                    new_dates.add((sh.slug, sh.date))
+                    events["dates"].append(sh)
+            elif sh.on_sale:
+                events["on_sale"].append(sh)
+
+        for key in [k for k in self.showings if k[1] < today]:
+            del self.showings[key]
+            self.dirty_showings.add(key)
+        for kind in events:
+            events[kind].sort(key=lambda sh: sh.key)
+        return events
+
+    def title(self, slug: str) -> str:
+        r = self.records.get(slug)
+        return r["title"] if r else slug
+
+    def mark_alerted(self, slugs):
+        for s in slugs:
+            self.records[s]["alerted"] = True
+            self.dirty.add(s)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS films (
+    market     TEXT NOT NULL,
+    slug       TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL,
+    misses     INTEGER NOT NULL DEFAULT 0,
+    alerted    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (market, slug)
+);
+CREATE INDEX IF NOT EXISTS idx_films_title ON films (title);
+CREATE INDEX IF NOT EXISTS idx_films_first_seen ON films (first_seen);
+CREATE TABLE IF NOT EXISTS showings (
+    market  TEXT NOT NULL,
+    slug    TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    time    TEXT NOT NULL,
+    format  TEXT NOT NULL DEFAULT '',
+    on_sale INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (market, slug, date, time, format)
+);
+CREATE INDEX IF NOT EXISTS idx_showings_date ON showings (market, date);
+CREATE TABLE IF NOT EXISTS markets (
+    market   TEXT PRIMARY KEY,
+    last_run TEXT
+);
+CREATE TABLE IF NOT EXISTS fetch_cache (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    hash          TEXT
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel      TEXT NOT NULL DEFAULT 'email',
+    created      TEXT NOT NULL,
+    subject      TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error   TEXT,
+    dead         INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS shard_cache (
+    market  TEXT NOT NULL,
+    start   TEXT NOT NULL,
+    fetched TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (market, start)
+);
+"""
+
+
+def open_cache(path: str = CACHE_DB) -> sqlite3.Connection:
+    """Open (creating if needed) the state DB. Errors are not swallowed: a
+    corrupt cache must stop the run rather than reset state and re-alert everything.
+
+    The pipeline hands the connection between worker threads, one stage at a
+    time, so the same-thread check is off."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    migrate_outbox_channel(conn)
+    migrate_title_rows(conn)
+    import_json_cache(conn)
+    return conn
+
+
+def migrate_outbox_channel(conn: sqlite3.Connection):
+    """Outboxes from before notifier backends held email only."""
+    if "channel" not in {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}:
+        with conn:
+            conn.execute("ALTER TABLE outbox ADD COLUMN channel TEXT NOT NULL DEFAULT 'email'")
+
+
+def migrate_title_rows(conn: sqlite3.Connection):
+    """Move rows from the old title-keyed table into films, keyed by slugified title."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'titles'").fetchone():
+        return
+    rows = conn.execute("SELECT market, title, first_seen, last_seen, misses, alerted FROM titles").fetchall()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO films (market, slug, title, first_seen, last_seen, misses, alerted) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(m, slugify(t), t, f, l, mi, a) for m, t, f, l, mi, a in rows],
+        )
+        conn.execute("DROP TABLE titles")
+    log.info(f"Migrated {len(rows)} title row(s) to slug-keyed films")
+
+
+def import_json_cache(conn: sqlite3.Connection, path: str = CACHE_FILE):
+    """One-time import of the old JSON cache (flat list = Austin, or market -> list/state)."""
+    if not os.path.exists(path) or conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+        return
+    with open(path) as f:
+        data = json.load(f)
+    now = datetime.now().isoformat(timespec="seconds")
+    if isinstance(data, list):
+        data = {"austin": data}
+    cache: Dict[str, MarketState] = {}
+    for market, entry in data.items():
+        if isinstance(entry, list):
+            state = MarketState.from_titles(entry, now)
+        else:
+            state = MarketState(
+                {slugify(t): dict(r, title=t) for t, r in entry["titles"].items()}, entry.get("last_run")
+            )
+        state.dirty = set(state.records)
+        cache[market] = state
+    # meta row first so save_cache's commit covers both
+    conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (now,))
+    save_cache(conn, cache)
+    log.info(f"Imported {sum(len(st.records) for st in cache.values())} title(s) from {path}")
+
+
+def load_cache(conn: sqlite3.Connection, markets) -> Dict[str, MarketState]:
+    cache = {}
+    for market in markets:
+        row = conn.execute("SELECT last_run FROM markets WHERE market = ?", (market,)).fetchone()
+        records = {
+            slug: {"title": title, "first_seen": first, "last_seen": last, "misses": misses, "alerted": bool(alerted)}
+            for slug, title, first, last, misses, alerted in conn.execute(
+                "SELECT slug, title, first_seen, last_seen, misses, alerted FROM films WHERE market = ?",
+                (market,),
+            )
+        }
+        showings = {
+            (slug, day, at, fmt): bool(on_sale)
+            for slug, day, at, fmt, on_sale in conn.execute(
+                "SELECT slug, date, time, format, on_sale FROM showings WHERE market = ?", (market,)
+            )
+        }
+        cache[market] = MarketState(records, row[0] if row else None, showings)
+    return cache
+
+
+def save_cache(conn: sqlite3.Connection, cache: Dict[str, MarketState]):
+    """Write only the dirty films and showings, all markets in one transaction.
+
+    A dirty key with no record any more has expired and is deleted.
+    """
+    with conn:
+        for market, state in cache.items():
+            if not state.dirty and not state.dirty_showings:
+                continue
+            conn.execute(
+                "INSERT INTO markets (market, last_run) VALUES (?, ?) "
+                "ON CONFLICT (market) DO UPDATE SET last_run = excluded.last_run",
+                (market, state.last_run),
+            )
+            if state.records:
+                # Set once: films first seen then were already showing, not new arrivals
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO NOTHING",
+                    (f"first_run:{market}", min(r["first_seen"] for r in state.records.values())),
+                )
+            conn.executemany(
+                "INSERT INTO films (market, slug, title, first_seen, last_seen, misses, alerted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (market, slug) DO UPDATE SET "
+                "title = excluded.title, last_seen = excluded.last_seen, "
+                "misses = excluded.misses, alerted = excluded.alerted",
+                [
+                    (market, s, r["title"], r["first_seen"], r["last_seen"], r["misses"], int(r["alerted"]))
+                    for s in state.dirty if (r := state.records.get(s))
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM films WHERE market = ? AND slug = ?",
+                [(market, s) for s in state.dirty if s not in state.records],
+            )
+            conn.executemany(
+                "INSERT INTO showings (market, slug, date, time, format, on_sale) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (market, slug, date, time, format) DO UPDATE SET on_sale = excluded.on_sale",
+                [(market, *k, int(state.showings[k])) for k in state.dirty_showings if k in state.showings],
+            )
+            conn.executemany(
+                "DELETE FROM showings WHERE market = ? AND slug = ? AND date = ? AND time = ? AND format = ?",
+                [(market, *k) for k in state.dirty_showings if k not in state.showings],
+            )
+            state.dirty.clear()
+            state.dirty_showings.clear()
+
+
+def load_fetch_cache(conn: sqlite3.Connection) -> FetchCache:
+    return FetchCache(
+        {
+            url: {"etag": etag, "last_modified": lm, "hash": digest}
+            for url, etag, lm, digest in conn.execute("SELECT url, etag, last_modified, hash FROM fetch_cache")
+        },
+        {
+            key[len("strategy:"):]: value
+            for key, value in conn.execute("SELECT key, value FROM meta WHERE key LIKE 'strategy:%'")
+        },
+        {
+            (market, start): (fetched, payload)
+            for market, start, fetched, payload in conn.execute("SELECT market, start, fetched, payload FROM shard_cache")
+        },
+    )
+
+
+def save_fetch_cache(conn: sqlite3.Connection, fetch_cache: FetchCache):
+    """Stage the new validators; committed by the save_cache() that follows."""
+    conn.executemany(
+        "INSERT INTO fetch_cache (url, etag, last_modified, hash) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (url) DO UPDATE SET etag = excluded.etag, "
+        "last_modified = excluded.last_modified, hash = excluded.hash",
+        [(url, v["etag"], v["last_modified"], v["hash"]) for url, v in fetch_cache.updated.items()],
+    )
+    conn.executemany(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        [(f"strategy:{market}", name) for market, name in fetch_cache.updated_strategies.items()],
+    )
+    conn.executemany(
+        "INSERT INTO shard_cache (market, start, fetched, payload) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (market, start) DO UPDATE SET fetched = excluded.fetched, payload = excluded.payload",
+        [(market, start, fetched, payload) for (market, start), (fetched, payload) in fetch_cache.updated_shards.items()],
+    )
+    # Windows that have fully passed
+    conn.execute("DELETE FROM shard_cache WHERE start < ?", ((date.today() - timedelta(days=max(SHARD_DAYS, 1))).isoformat(),))
+    fetch_cache.entries.update(fetch_cache.updated)
+    fetch_cache.updated.clear()
+    fetch_cache.strategies.update(fetch_cache.updated_strategies)
+    fetch_cache.updated_strategies.clear()
+    fetch_cache.shards.update(fetch_cache.updated_shards)
+    fetch_cache.updated_shards.clear()
+
+
+def event_lines(state: MarketState, events: Dict[str, List[Showing]]) -> List[str]:
+    """Human-readable lines for the showing events enabled in ALERT_EVENTS."""
+    lines = []
+    enabled = {e.strip() for e in ALERT_EVENTS.split(",")}
+    for sh in events["dates"] if "dates" in enabled else ():
+        lines.append(f"{state.title(sh.slug)} — new date {sh.date}")
+    for sh in events["showtimes"] if "showtimes" in enabled else ():
+        lines.append(f"{state.title(sh.slug)} — new showtime {sh.date} {sh.time} {sh.format}".rstrip())
+    for sh in events["on_sale"] if "on_sale" in enabled else ():
+        lines.append(f"{state.title(sh.slug)} — on sale {sh.date} {sh.time} {sh.format}".rstrip())
+    return lines
+
+
+def email_enabled() -> bool:
+    return EMAIL_ENABLED and all([EMAIL_TO, EMAIL_FROM, EMAIL_PASS])
+
+
+def build_email(new_by_market: Dict[str, List[str]], updates_by_market: Optional[Dict[str, List[str]]] = None) -> Tuple[str, str]:
+    """Subject and body of one merged alert covering every theater with new titles or showing updates."""
+    updates_by_market = updates_by_market or {}
+    new = sorted({t for titles in new_by_market.values() for t in titles})
+    if new:
+        subject = f"NEW MOVIE: {', '.join(new)}"
+    else:
+        subject = f"Alamo updates: {sum(len(u) for u in updates_by_market.values())} showing change(s)"
+    sections = []
+    for market in sorted(set(new_by_market) | set(updates_by_market)):
+        parts = []
+        if new_by_market.get(market):
+            parts.append(f"New in {theater_name(market)}:\n\n" + "\n".join(f"• {t}" for t in new_by_market[market]))
+        if updates_by_market.get(market):
+            parts.append(f"Updates in {theater_name(market)}:\n\n" + "\n".join(f"• {u}" for u in updates_by_market[market]))
+        parts.append(THEATERS.get(market) or URL_TEMPLATE.format(market=market))
+        sections.append("\n\n".join(parts))
+    return subject, "\n\n".join(sections)
+
+
+def enqueue_alert(conn: sqlite3.Connection, channels: List[str], subject: str, body: str):
+    """Queue an alert once per notifier channel. Not committed here: the
+    caller's save_cache() commits it together with the state change, so an
+    alert is never recorded as sent without also being durably queued."""
+    created = datetime.now().isoformat(timespec="seconds")
+    conn.executemany(
+        "INSERT INTO outbox (channel, created, subject, body) VALUES (?, ?, ?, ?)",
+        [(channel, created, subject, body) for channel in channels],
+    )
+
+
+class Notifier:
+    """An alert backend. send() blocks and is run on a worker thread."""
+
+    channel = ""
+    timeout = NOTIFY_TIMEOUT
+
+    def enabled(self) -> bool:
+        return True
+
+    def send(self, subject: str, body: str):
+        raise NotImplementedError
+
+    def reset(self):
+        """Drop a connection a timed-out send may still be using."""
+        self.close()
+
+    def close(self):
+        pass
+
+
+class FileNotifier(Notifier):
+    """Append alerts to NOTIFY_FILE, or print them if it is "-"."""
+
+    channel = "file"
+
+    def __init__(self, path: str = NOTIFY_FILE):
+        self.path = path
+
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def send(self, subject: str, body: str):
+        text = f"=== {datetime.now().isoformat(timespec='seconds')} {subject}\n\n{body}\n\n"
+        if self.path == "-":
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+
+class HttpNotifier(Notifier):
+    """JSON POST to a webhook over one kept-alive connection.
+
+    Sends are spaced at least min_interval seconds apart (the services
+    throttle per webhook); a 429 or other error status fails the send and
+    the outbox backs off.
+    """
+
+    min_interval = 0.0
+    max_len = 0  # longest text the service accepts; 0 = no limit
+
+    def __init__(self, url: str = ""):
+        self.url = url
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.last_send = 0.0
+
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def payload(self, subject: str, body: str) -> dict:
+        raise NotImplementedError
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def clip(self, text: str) -> str:
+        return text if not self.max_len or len(text) <= self.max_len else text[: self.max_len - 1] + "…"
+
+    def connection(self) -> http.client.HTTPConnection:
+        if self.conn is None:
+            parts = urllib.parse.urlsplit(self.url)
+            cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            self.conn = cls(parts.netloc, timeout=HTTP_TIMEOUT)
+        return self.conn
+
+    def post(self, data: bytes) -> Tuple[int, bytes]:
+        parts = urllib.parse.urlsplit(self.url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {"Content-Type": "application/json", "User-Agent": USER_AGENT, **self.headers()}
+        # A pooled connection the server has since closed fails on first use; retry that once on a fresh one
+        for fresh in ((True,) if self.conn is None else (False, True)):
+            try:
+                conn = self.connection()
+                conn.request("POST", path, data, headers)
+                resp = conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if fresh:
+                    raise
+
+    def send(self, subject: str, body: str):
+        wait_s = self.last_send + self.min_interval - time.monotonic()
+        if wait_s > 0:
+            time.sleep(wait_s)
+        try:
+            status, text = self.post(json.dumps(self.payload(subject, body)).encode())
+        finally:
+            self.last_send = time.monotonic()
+        if status >= 300:
+            raise RuntimeError(f"HTTP {status}: {text[:200].decode('utf-8', 'replace')}")
+
+    def reset(self):
+        self.conn = None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class WebhookNotifier(HttpNotifier):
+    channel = "webhook"
+
+    def __init__(self, url: str = WEBHOOK_URL):
+        super().__init__(url)
+
+    def payload(self, subject: str, body: str) -> dict:
+        return {"source": "alamo_alert", "subject": subject, "body": body}
+
+
+class DiscordNotifier(HttpNotifier):
+    channel = "discord"
+    min_interval = 2.0  # 30 requests/minute per webhook
+    max_len = 2000
+
+    def __init__(self, url: str = DISCORD_WEBHOOK_URL):
+        super().__init__(url)
+
+    def payload(self, subject: str, body: str) -> dict:
+        return {"content": self.clip(f"**{subject}**\n{body}")}
+
+
+class SlackNotifier(HttpNotifier):
+    channel = "slack"
+    min_interval = 1.0
+    max_len = 40000
+
+    def __init__(self, url: str = SLACK_WEBHOOK_URL):
+        super().__init__(url)
+
+    def payload(self, subject: str, body: str) -> dict:
+        return {"text": self.clip(f"*{subject}*\n{body}")}
+
+
+class NtfyNotifier(HttpNotifier):
+    """ntfy push via its JSON publish endpoint (server root, topic in the body)."""
+
+    channel = "ntfy"
+    min_interval = 1.0
+    max_len = 4000
+
+    def __init__(self, url: str = NTFY_URL, token: str = NTFY_TOKEN):
+        parts = urllib.parse.urlsplit(url)
+        super().__init__(f"{parts.scheme}://{parts.netloc}/" if url else "")
+        self.topic = parts.path.strip("/")
+        self.token = token
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def payload(self, subject: str, body: str) -> dict:
+        return {
+            "topic": self.topic,
+            "title": subject[:250],
+            "message": self.clip(body),
+            "tags": ["movie_camera"],
+            "click": next(iter(THEATERS.values()), ""),
+        }
+
+
+class Mailer(Notifier):
+    """One SMTP session reused for every queued message, and across polls in daemon mode."""
+
+    channel = "email"
+
+    def __init__(self):
+        self.smtp = None
+
+    def enabled(self) -> bool:
+        return email_enabled()
+
+    def session(self):
+        import smtplib
+
+        if self.smtp is not None:
+            try:
+                if self.smtp.noop()[0] == 250:
+                    return self.smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        host, _, port = EMAIL_SMTP.partition(":")
+        s = smtplib.SMTP(host, int(port or 587), timeout=HTTP_TIMEOUT)
+        if EMAIL_STARTTLS:
+            s.starttls()
+        s.login(EMAIL_FROM, EMAIL_PASS)
+        self.smtp = s
+        return s
+
+    def send(self, subject: str, body: str):
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
+        msg = MIMEMultipart()
+        msg["From"] = EMAIL_FROM
+        msg["To"] = EMAIL_TO
+        msg["Subject"] = subject
+        msg.attach(MIMEText(body, "plain"))
+        recipients = [r.strip() for r in EMAIL_TO.split(",") if r.strip()]
+        self.session().sendmail(EMAIL_FROM, recipients, msg.as_string())
+
+    def reset(self):
+        self.smtp = None  # the abandoned send still owns the socket
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                pass
+            self.smtp = None
+
+
+# Built-in backends by channel; each is used when its own settings are present.
+# A plugin is a Notifier subclass added here before main() runs.
+NOTIFIERS = {
+    cls.channel: cls
+    for cls in (Mailer, WebhookNotifier, DiscordNotifier, SlackNotifier, NtfyNotifier, FileNotifier)
+}
+
+
+def make_notifiers() -> List[Notifier]:
+    return [n for n in (cls() for cls in NOTIFIERS.values()) if n.enabled()]
+
+
+def batch_message(rows) -> Tuple[str, str]:
+    """One subject/body for every alert queued on a channel, oldest first."""
+    if len(rows) == 1:
+        return rows[0][1], rows[0][2]
+    subject = f"{rows[-1][1]} (+{len(rows) - 1} earlier alert(s))"
+    return subject, "\n\n———\n\n".join(f"{subj}\n\n{body}" for _, subj, body, _ in rows)
+
+
+async def flush_channel(conn: sqlite3.Connection, notifier: Notifier) -> int:
+    """Deliver everything due on one channel as a single message; on failure
+    the whole batch backs off exponentially."""
+    now = time.time()
+    due = conn.execute(
+        "SELECT id, subject, body, attempts FROM outbox"
+        " WHERE channel = ? AND NOT dead AND next_attempt <= ? ORDER BY id",
+        (notifier.channel, now),
+    ).fetchall()
+    if not due:
+        return 0
+    ids = [(row[0],) for row in due]
+    subject, body = batch_message(due)
+    try:
+        await asyncio.wait_for(asyncio.to_thread(notifier.send, subject, body), notifier.timeout)
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            notifier.reset()
+            e = f"timed out after {notifier.timeout:g}s"
+        else:
+            notifier.close()
+        attempts = max(row[3] for row in due) + 1
+        delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** (attempts - 1))
+        dead = attempts >= OUTBOX_MAX_ATTEMPTS
+        with conn:
+            conn.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ?, dead = ? WHERE id = ?",
+                [(attempts, now + delay, str(e), int(dead), msg_id) for (msg_id,) in ids],
+            )
+        if dead:
+            log.error(f"[{notifier.channel}] Alert failed for good after {attempts} attempt(s): {subject} ({e})")
+        else:
+            log.error(f"[{notifier.channel}] Alert failed (attempt {attempts}), retrying in {delay}s: {e}")
+        return 0
+    with conn:
+        conn.executemany("DELETE FROM outbox WHERE id = ?", ids)
+    log.info(f"[{notifier.channel}] Alert sent ({len(ids)} queued message(s) in one)")
+    return len(ids)
+
+
+async def flush_outbox(conn: sqlite3.Connection, notifiers: List[Notifier]) -> int:
+    """Fan the outbox out to every notifier at once, so a slow backend only delays its own queue."""
+    return sum(await asyncio.gather(*(flush_channel(conn, n) for n in notifiers)))
+
+
+# === SCHEDULING ===
+class AdaptiveSchedule:
+    """Poll interval learned from when films first showed up.
+
+    first_seen timestamps are bucketed by hour of the week and smoothed
+    across neighbouring hours; every hour gets a floor of 1 so quiet hours
+    are still polled. Hot hours get proportionally shorter intervals. If
+    the rest of today's ideal schedule would overrun POLL_DAILY_BUDGET, all
+    intervals are stretched to fit.
+    """
+
+    def __init__(self, base_interval: int = DAEMON_INTERVAL):
+        self.base = base_interval
+        self.heat = [1.0] * 168
+
+    @staticmethod
+    def hour_of_week(dt: datetime) -> int:
+        return dt.weekday() * 24 + dt.hour
+
+    def learn(self, conn: sqlite3.Connection):
+        """Count genuine arrivals only: a market's first run (or the JSON
+        import) stamps everything already showing with that moment, which
+        says nothing about when films get added. Markets saved before
+        first_run was recorded fall back to their earliest first_seen."""
+        since = (datetime.now() - timedelta(days=SCHEDULE_HISTORY_DAYS)).isoformat(timespec="seconds")
+        counts = [0] * 168
+        rows = conn.execute(
+            "SELECT f.first_seen FROM films f "
+            "JOIN (SELECT market, MIN(first_seen) AS seeded FROM films GROUP BY market) s ON s.market = f.market "
+            "LEFT JOIN meta m ON m.key = 'first_run:' || f.market "
+            "WHERE f.first_seen >= ? AND f.first_seen > COALESCE(m.value, s.seeded)",
+            (since,),
+        )
+        for (first_seen,) in rows:
+            try:
+                counts[self.hour_of_week(datetime.fromisoformat(first_seen))] += 1
+            except ValueError:
+                continue
+        heat = [1 + counts[h] + 0.5 * (counts[h - 1] + counts[(h + 1) % 168]) for h in range(168)]
+        mean = sum(heat) / len(heat)
+        self.heat = [x / mean for x in heat]
+
+    def ideal_interval(self, dt: datetime) -> float:
+        return min(POLL_MAX_INTERVAL, max(POLL_MIN_INTERVAL, self.base / self.heat[self.hour_of_week(dt)]))
+
+    def next_interval(self, now: datetime, polls_today: int) -> float:
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        remaining = POLL_DAILY_BUDGET - polls_today
+        if remaining <= 0:
+            log.info(f"Daily budget of {POLL_DAILY_BUDGET} poll(s) spent; waiting for midnight")
+            return (midnight - now).total_seconds() + random.uniform(0, POLL_MIN_INTERVAL)
+
+        # Polls the ideal schedule would still make today, hour by hour
+        want, t = 0.0, now
+        while t < midnight:
+            hour_end = min(midnight, t.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+            want += (hour_end - t).total_seconds() / self.ideal_interval(t)
+            t = hour_end
+        stretch = max(1.0, want / remaining)
+        interval = self.ideal_interval(now) * stretch
+        return max(POLL_MIN_INTERVAL, interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER))
+
+
+def polls_today(conn: sqlite3.Connection) -> Tuple[int, float]:
+    """(polls made today, epoch of the last poll)."""
+    meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('poll_day', 'poll_count', 'last_poll')"))
+    count = int(meta.get("poll_count", 0)) if meta.get("poll_day") == datetime.now().date().isoformat() else 0
+    return count, float(meta.get("last_poll", 0))
+
+
+def record_poll(conn: sqlite3.Connection):
+    count, _ = polls_today(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [
+                ("poll_day", datetime.now().date().isoformat()),
+                ("poll_count", str(count + 1)),
+                ("last_poll", str(time.time())),
+            ],
+        )
+
+
+def next_poll_delay(schedule: AdaptiveSchedule) -> float:
+    conn = open_cache()
+    try:
+        schedule.learn(conn)
+        count, _ = polls_today(conn)
+    finally:
+        conn.close()
+    return schedule.next_interval(datetime.now(), count)
+
+
+def poll_due(schedule: AdaptiveSchedule) -> bool:
+    """For cron: is the adaptive interval since the last poll up yet?
+
+    Evaluated without jitter so a fixed-rate cron doesn't flap.
+    """
+    conn = open_cache()
+    try:
+        schedule.learn(conn)
+        count, last = polls_today(conn)
+    finally:
+        conn.close()
+    if count >= POLL_DAILY_BUDGET:
+        log.info(f"Daily budget of {POLL_DAILY_BUDGET} poll(s) spent; skipping")
+        return False
+    wait_s = schedule.ideal_interval(datetime.now()) - (time.time() - last)
+    if wait_s > 0:
+        log.info(f"Quiet window; next poll due in {wait_s:.0f}s, skipping")
+        return False
+    return True
+
+
+def run_check(pool: Optional[DriverPool] = None, notifiers: Optional[List[Notifier]] = None):
+    """Sync entry point for cron: one check on a fresh event loop."""
+    asyncio.run(run_check_async(pool, notifiers))
+
+
+async def run_check_async(pool: Optional[DriverPool] = None, notifiers: Optional[List[Notifier]] = None):
+    """One instrumented check; phase timings go to METRICS_FILE / PROM_FILE."""
+    global _metrics
+    _metrics = RunMetrics()
+    try:
+        await check_theaters(pool, notifiers)
+    finally:
+        _metrics.close()
+        try:
+            _metrics.write()
+        except OSError as e:
+            log.warning(f"Could not write metrics: {e}")
+        _metrics = None
+
+
+def update_state(conn: sqlite3.Connection, current: Dict[str, Calendar],
+                 fetch_cache: Optional[FetchCache] = None, channels: List[str] = ()) -> int:
+    """Diff each market's scrape into the cache, queue the alert and commit
+    both (plus the new fetch validators) in one transaction. Returns the
+    number of newly alerted films."""
+    unchanged = [m for m, cal in current.items() if cal.unchanged]
+    for market in unchanged:
+        log.info(f"[{market}] Short-circuited: calendar unchanged, skipping parse, diff and cache write")
+    current = {m: cal for m, cal in current.items() if not cal.unchanged}
+    if not current:
+        if fetch_cache is not None:
+            # Nothing to diff, but refreshed shard windows and strategies still count
+            with conn:
+                save_fetch_cache(conn, fetch_cache)
+        return 0
+    cache = load_cache(conn, current)
+    now = datetime.now().isoformat(timespec="seconds")
+    today = now[:10]
+    new_by_market: Dict[str, List[str]] = {}
+    updates_by_market: Dict[str, List[str]] = {}
+    alerted: Dict[str, List[str]] = {}
+    for market, cal in current.items():
+        if not cal:
+            log.warning(f"[{market}] Scrape returned nothing; leaving state untouched")
+            continue
+        state = cache[market]
+        cal = state.group_films(cal, market)
+        new, changed = state.apply(cal.films, now)
+        log.info(f"[{market}] {len(changed)} film(s) changed, {len(state.missing)} missing")
+        if new:
+            alerted[market] = new
+            new_by_market[market] = [state.title(s) for s in new]
+            log.info(f"[{market}] NEW: {', '.join(new_by_market[market])}")
+        if cal.showings is not None:
+            events = state.apply_showings(cal.showings, set(new), today)
+            log.info(
+                f"[{market}] Showings: {len(events['showtimes'])} new, "
+                f"{len(events['dates'])} new date(s), {len(events['on_sale'])} now on sale"
+            )
+            lines = event_lines(state, events)
+            if lines:
+                updates_by_market[market] = lines
+
+    if new_by_market or updates_by_market:
+        if channels:
+            enqueue_alert(conn, channels, *build_email(new_by_market, updates_by_market))
+        for market, slugs in alerted.items():
+            cache[market].mark_alerted(slugs)
+    else:
+        log.info("No new movies")
+
+    if fetch_cache is not None:
+        save_fetch_cache(conn, fetch_cache)
+    save_cache(conn, cache)
+    return sum(len(v) for v in alerted.values())
+
+
+def begin_poll(conn: sqlite3.Connection) -> FetchCache:
+    record_poll(conn)
+    return load_fetch_cache(conn)
+
+
+async def check_theaters(pool: Optional[DriverPool] = None, notifiers: Optional[List[Notifier]] = None):
+    """fetch -> state -> deliver. Blocking cache I/O runs on a worker thread;
+    theaters are fetched and notifiers sent to concurrently."""
+    log.info(f"=== Alamo New Movie Check ({', '.join(THEATERS)}) ===")
+    own_notifiers = notifiers is None
+    notifiers = make_notifiers() if own_notifiers else notifiers
+    conn = await asyncio.to_thread(open_cache)
+    try:
+        fetch_cache = await asyncio.to_thread(begin_poll, conn)
+        own_pool = pool is None
+        pool = pool or DriverPool()
+        try:
+            with phase("fetch"):
+                current = await fetch_all_theaters(THEATERS, pool, fetch_cache)
+        finally:
+            if own_pool:
+                with phase("shutdown"):
+                    await asyncio.to_thread(pool.close)
+
+        with phase("state"):
+            new_films = await asyncio.to_thread(
+                update_state, conn, current, fetch_cache, [n.channel for n in notifiers]
+            )
+        if _metrics:
+            _metrics.extra["new_films"] = new_films
+
+        with phase("deliver"):
+            await flush_outbox(conn, notifiers)
+    finally:
+        conn.close()
+        if own_notifiers:
+            for n in notifiers:
+                n.close()
+    log.info("Done\n")
+
+
+def run_daemon(interval: int, adaptive: bool = False):
+    """Poll forever on warm drivers; a crashed poll recycles Chrome and carries on."""
+    try:
+        asyncio.run(daemon_loop(interval, adaptive))
+    except KeyboardInterrupt:
+        pass
+    log.info("Daemon stopping")
+
+
+async def daemon_loop(interval: int, adaptive: bool = False):
+    pool = DriverPool()
+    notifiers = make_notifiers()
+    schedule = AdaptiveSchedule(interval) if adaptive else None
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    log.info(f"Daemon started: polling every {interval}s{' (adaptive)' if adaptive else ''}")
+    try:
+        while True:
+            start = time.monotonic()
+            try:
+                await run_check_async(pool, notifiers)
+            except Exception as e:
+                log.exception(f"Poll crashed: {e}")
+                for warm in pool.drivers:
+                    warm.recycle("poll crashed")
+            if schedule:
+                try:
+                    delay = await asyncio.to_thread(next_poll_delay, schedule)
+                except Exception as e:
+                    log.warning(f"Adaptive schedule failed, using --interval: {e}")
+                    delay = interval
+                log.info(f"Next poll in {delay:.0f}s")
+            else:
+                delay = interval
+            await asyncio.sleep(max(0.0, delay - (time.monotonic() - start)))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        pool.close()
+        for n in notifiers:
+            n.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alamo Drafthouse new movie alert")
+    parser.add_argument("--daemon", action="store_true", help="keep running and re-poll on a schedule")
+    parser.add_argument("--interval", type=int, default=DAEMON_INTERVAL, help="seconds between polls in daemon mode")
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="poll more in historically busy hours and less in quiet ones; "
+             "without --daemon, skip this run if the next poll isn't due yet",
+    )
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(args.interval, args.adaptive)
+    elif not args.adaptive or poll_due(AdaptiveSchedule(args.interval)):
+        run_check()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+"""
+Resource blocking in Chrome: bytes on the wire and load time for the fixture
+calendar with a live page's weight (fixtures.ASSETS), with BLOCK_RESOURCES
+off and then as configured. Every load gets a fresh Chrome, so nothing comes
+from its cache. Needs Chrome and chromedriver.
+
+Load time is driver.get() until network idle (NETWORK_IDLE_MS without a
+request in flight), which is what the scraper waits for before it looks.
+
+    python benchmarks/bench_blocking.py [--size 500] [--repeat 3] [--block images,fonts,...] [--out FILE]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from bench_run import RESULTS_DIR, git_rev, setup  # noqa: E402
+from server import FixtureServer  # noqa: E402
+
+
+def load_page(aa, url: str) -> dict:
+    driver = aa.get_driver()
+    try:
+        aa.drain_network_log(driver)
+        start = time.monotonic()
+        driver.get(url)
+        aa.install_watchers(driver)
+        aa.wait_phase(driver, "network_idle", aa.network_idle(), aa.PAGE_READY_TIMEOUT)
+        load_s = time.monotonic() - start
+        usage = aa.network_usage(aa.drain_network_log(driver))
+        links = aa.link_count(driver)
+    finally:
+        driver.quit()
+    return dict(usage, load_s=load_s, links=links)
+
+
+def bench_mode(aa, url: str, block: str, repeat: int) -> dict:
+    aa.BLOCK_RESOURCES = block
+    runs = [load_page(aa, url) for _ in range(repeat)]
+    return {
+        "block": block,
+        "load_s": statistics.median(r["load_s"] for r in runs),
+        "bytes": statistics.median(r["allowed_bytes"] for r in runs),
+        "requests": statistics.median(r["allowed"] for r in runs),
+        "blocked": statistics.median(r["blocked"] for r in runs),
+        "links": runs[-1]["links"],
+    }
+
+
+def run(args):
+    out = os.path.abspath(args.out or os.path.join(RESULTS_DIR, f"blocking-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    with tempfile.TemporaryDirectory() as workdir:
+        aa = setup(workdir, "selenium")
+        block = args.block if args.block is not None else aa.BLOCK_RESOURCES
+        with FixtureServer() as srv:
+            url = srv.url(f"/{args.size}/austin?showCalendar=true&assets=1")
+            off, on = (bench_mode(aa, url, b, args.repeat) for b in ("", block))
+    for r in (off, on):
+        print(
+            f"{r['block'] or 'no blocking':<34} load {r['load_s'] * 1000:7.0f} ms  "
+            f"{r['bytes'] / 1024:7.0f} KB in {r['requests']:.0f} request(s), {r['blocked']:.0f} blocked"
+        )
+    if off["links"] != on["links"]:
+        print(f"WARNING: blocking changed the calendar ({off['links']} -> {on['links']} links)")
+    print(
+        f"Saved {(off['bytes'] - on['bytes']) / 1024:.0f} KB ({1 - on['bytes'] / off['bytes']:.0%})"
+        f" and {(off['load_s'] - on['load_s']) * 1000:.0f} ms ({1 - on['load_s'] / off['load_s']:.0%}) per load"
+    )
+    doc = {
+        "meta": {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": git_rev(), "size": args.size, "repeat": args.repeat},
+        "results": [off, on],
+    }
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"Results: {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--block", help="categories to compare against none (default: BLOCK_RESOURCES)")
+    parser.add_argument("--out")
+    run(parser.parse_args())
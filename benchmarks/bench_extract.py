@@ -0,0 +1,85 @@
+"""
+Compare the HTML extraction backends over calendar fixtures, then the
+embedded-JSON extractors (__NEXT_DATA__, JSON-LD) against the table walk on
+pages that carry both.
+
+Uses synthetic pages from fixtures.py plus any saved pages in
+benchmarks/fixtures/*.html (drop a real page_source dump there to include it).
+
+    python benchmarks/bench_extract.py [sizes...]
+"""
+
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alamo_alert  # noqa: E402
+from fixtures import FIXTURE_DIR, calendar_html, showing_set  # noqa: E402
+
+REPEAT = 5
+
+
+def best_of(fn, arg, repeat: int = REPEAT):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def saved_pages():
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        with open(path) as f:
+            yield os.path.basename(path), f.read()
+
+
+def pages(sizes):
+    for n in sizes:
+        yield f"synthetic {n}", calendar_html(n)
+    yield from saved_pages()
+
+
+def main(sizes):
+    alamo_alert.log.setLevel(logging.WARNING)
+    backends = ["soup", "strainer"] + (["lxml"] if alamo_alert.lxml_html else [])
+    print(f"{'page':<28}{'KB':>8}{'films':>8}{'shows':>8}" + "".join(f"{b + ' ms':>14}" for b in backends))
+    for name, html in pages(sizes):
+        timings, reference = [], None
+        for b in backends:
+            secs, cal = best_of(alamo_alert.HTML_EXTRACTORS[b], html)
+            summary = ({s: f.title for s, f in cal.films.items()}, cal.showings)
+            if reference is None:
+                reference = summary
+            elif summary != reference:
+                print(f"  !! {b} disagrees with {backends[0]} on {name}")
+            timings.append(secs * 1000)
+        films, shows = reference
+        print(
+            f"{name:<28}{len(html) / 1024:>8.0f}{len(films):>8}{len(shows or ()):>8}"
+            + "".join(f"{t:>14.1f}" for t in timings)
+        )
+
+    # Embedded JSON vs the DOM walk. JSON-LD only lists films with showtimes,
+    # so agreement is checked on showings.
+    print(f"\n{'page':<28}{'KB':>8}{'shows':>8}{'table ms':>14}{'state ms':>14}{'jsonld ms':>14}  agree")
+    embedded = [(f"next {n}", calendar_html(n, embed="next")) for n in sizes]
+    embedded += [(f"jsonld {n}", calendar_html(n, embed="jsonld")) for n in sizes]
+    for name, html in embedded + list(saved_pages()):
+        table_s, table = best_of(alamo_alert.extract_table, html)
+        row = f"{name:<28}{len(html) / 1024:>8.0f}{len(table.showings or ()):>8}{table_s * 1000:>14.1f}"
+        agree = []
+        for kind in ("state", "jsonld"):
+            secs, cal = best_of(alamo_alert.STRATEGIES[kind][2], html)
+            row += f"{secs * 1000:>14.1f}"
+            if cal.showings:
+                agree.append(kind if showing_set(cal) == showing_set(table) else f"!{kind}")
+        print(row + "  " + (" ".join(agree) or "-"))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [50, 500, 5000])
@@ -0,0 +1,168 @@
+"""
+End-to-end benchmark: full run_check() against the local stand-in.
+
+For each calendar size a fresh cache is primed with one discarded run, then
+the steady-state check is repeated. Per-phase latencies and peak RSS come
+from the run's own metrics (METRICS_FILE); extraction throughput is film
+and showtime links parsed per second of the parse phase. Stored fetch
+validators are dropped before every run so the full pipeline is measured;
+--conditional keeps them and measures the 304/unchanged short-circuit.
+With --engine selenium, run once with and once without CHROME_LOW_MEMORY=true
+and --compare the two to see the peak RSS difference.
+
+    python benchmarks/bench_run.py [--sizes 50 500 5000] [--repeat 3] [--engine http|selenium]
+                                   [--conditional] [--out FILE]
+    python benchmarks/bench_run.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+sys.path.insert(0, ROOT)
+
+from fixtures import calendar_html  # noqa: E402
+from server import FixtureServer  # noqa: E402
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def setup(workdir: str, engine: str):
+    """Point alamo_alert at a scratch directory before it reads its config."""
+    os.chdir(workdir)
+    os.environ.update({
+        "FETCH_MODE": engine,
+        "ALAMO_API_URL": "",
+        "CACHE_DB": os.path.join(workdir, "cache.db"),
+        "METRICS_FILE": os.path.join(workdir, "metrics.jsonl"),
+        "EMAIL_ENABLED": "false",
+    })
+    import alamo_alert
+    alamo_alert.log.setLevel("WARNING")
+    return alamo_alert
+
+
+def last_metrics(path: str) -> dict:
+    with open(path) as f:
+        return json.loads(f.readlines()[-1])
+
+
+def forget_validators(aa):
+    conn = aa.open_cache()
+    with conn:
+        conn.execute("DELETE FROM fetch_cache")
+    conn.close()
+
+
+def bench_size(aa, srv: FixtureServer, size: int, repeat: int, conditional: bool = False) -> dict:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(aa.CACHE_DB + suffix):
+            os.remove(aa.CACHE_DB + suffix)
+    aa.THEATERS = {"austin": srv.url(f"/{size}/austin?showCalendar=true")}
+    cal = aa.html_extractor()(calendar_html(size))
+    links = len(cal.films) + len(cal.showings or ())
+
+    aa.run_check()  # prime the cache
+    runs = []
+    for _ in range(repeat):
+        if not conditional:
+            forget_validators(aa)
+        aa.run_check()
+        runs.append(last_metrics(aa.METRICS_FILE))
+
+    phases = {}
+    for run in runs:
+        for p in run["phases"]:
+            name = f"{p['market']}/{p['phase']}" if p["market"] else p["phase"]
+            phases.setdefault(name, []).append(p["wall_s"])
+    phase_median = {name: statistics.median(v) for name, v in sorted(phases.items())}
+    parse_s = sum(v for k, v in phase_median.items() if k.rsplit("/", 1)[-1].startswith(("parse", "extract")))
+    return {
+        "size": size,
+        "links": links,
+        "e2e_s": statistics.median(r["wall_s"] for r in runs),
+        "peak_rss": max(r["peak_rss"] for r in runs),
+        "links_per_s": round(links / parse_s) if parse_s else None,
+        "phases": phase_median,
+    }
+
+
+def run(args):
+    out = os.path.abspath(args.out or os.path.join(RESULTS_DIR, f"run-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    with tempfile.TemporaryDirectory() as workdir:
+        aa = setup(workdir, args.engine)
+        with FixtureServer() as srv:
+            results = []
+            for size in args.sizes:
+                r = bench_size(aa, srv, size, args.repeat, args.conditional)
+                results.append(r)
+                print(
+                    f"{size:>6} showtimes  e2e {r['e2e_s'] * 1000:8.1f} ms  "
+                    f"peak {r['peak_rss'] / 1e6:6.0f} MB  {r['links_per_s'] or 0:>9} links/s"
+                )
+    doc = {
+        "meta": {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_rev(),
+            "python": platform.python_version(),
+            "engine": args.engine,
+            "extractor": aa.EXTRACTOR,
+            "chrome_low_memory": aa.CHROME_LOW_MEMORY,
+            "repeat": args.repeat,
+            "conditional": args.conditional,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"Results: {out}")
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path) as f:
+        old = {r["size"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["size"]: r for r in json.load(f)["results"]}
+
+    def delta(a, b):
+        return f"{(b - a) / a * 100:+6.1f}%" if a and b is not None else "    n/a"
+
+    print(f"{'size':>6}{'e2e ms':>18}{'peak MB':>18}{'links/s':>22}")
+    for size in sorted(set(old) & set(new)):
+        o, n = old[size], new[size]
+        print(
+            f"{size:>6}"
+            f"{n['e2e_s'] * 1000:>10.1f} {delta(o['e2e_s'], n['e2e_s'])}"
+            f"{n['peak_rss'] / 1e6:>10.0f} {delta(o['peak_rss'], n['peak_rss'])}"
+            f"{n['links_per_s'] or 0:>14} {delta(o['links_per_s'], n['links_per_s'])}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", choices=["http", "selenium"], default="http")
+    parser.add_argument("--conditional", action="store_true", help="keep ETag/hash validators between runs")
+    parser.add_argument("--out")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
@@ -0,0 +1,240 @@
+"""
+Synthetic Drafthouse calendar pages for the benchmarks.
+
+The markup mimics the live ?showCalendar=true page: a nav/carousel full of
+film links outside the calendar, a large inline script, and a table with one
+row per film and one cell per date holding the showtime links. With embed=
+"next" or "jsonld" the same schedule also ships as a __NEXT_DATA__ blob or as
+schema.org ScreeningEvents. app_html() is the same calendar as a client-side
+app that renders from a paged JSON API (schedule_page()) behind Load More.
+With assets=True the page also pulls in a live page's weight (ASSETS):
+stylesheet, web fonts, a hero image and trailer, posters and tracker tags.
+Output is deterministic for a given size so runs can be compared.
+
+    python benchmarks/fixtures.py 50 500 5000    # writes benchmarks/fixtures/calendar_<n>.html
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from html import escape
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# /static/<name> -> bytes. Trackers keep their vendor's host in the path, so
+# the BLOCK_PATTERNS host wildcards match them when served locally.
+ASSETS = {
+    "site.css": 4_000,
+    "app.js": 60_000,
+    "fonts/brand.woff2": 45_000,
+    "fonts/brand-bold.woff2": 45_000,
+    "hero.webp": 250_000,
+    "trailer.mp4": 800_000,
+    "www.googletagmanager.com/gtm.js": 90_000,
+    "connect.facebook.net/fbevents.js": 70_000,
+}
+POSTER_BYTES = 40_000  # each card's /img/<slug>.jpg
+ASSETS_HTML = (
+    '<link rel="stylesheet" href="/static/site.css">'
+    "<style>@font-face{font-family:brand;src:url(/static/fonts/brand.woff2)}"
+    "@font-face{font-family:brand;font-weight:bold;src:url(/static/fonts/brand-bold.woff2)}"
+    "body{font-family:brand}th{font-weight:bold}</style>"
+    '<script src="/static/app.js"></script>'
+    '<script async src="/static/www.googletagmanager.com/gtm.js"></script>'
+    '<script async src="/static/connect.facebook.net/fbevents.js"></script>'
+)
+MEDIA_HTML = '<img src="/static/hero.webp"><video src="/static/trailer.mp4" preload="auto" muted></video>'
+
+
+def asset_body(name: str) -> bytes:
+    """Filler of the asset's size; scripts and stylesheets stay parseable."""
+    size = ASSETS.get(name, POSTER_BYTES)
+    if name.endswith((".js", ".css")):
+        return b"/*" + b" " * (size - 4) + b"*/"
+    return b"\0" * size
+
+WORDS = (
+    "night dawn return last house blood star city ghost river king queen fire "
+    "shadow empire summer winter dream iron glass wild heart storm silent road"
+).split()
+FORMATS = ("Digital", "35mm", "70mm", "Open Caption", "Quote-Along", "IMAX")
+TIMES = ("11:00AM", "1:30PM", "4:15PM", "7:00PM", "9:45PM", "11:59PM")
+
+
+def film_list(n_films: int, rng: random.Random):
+    films, seen = [], set()
+    while len(films) < n_films:
+        title = " ".join(w.capitalize() for w in rng.sample(WORDS, rng.randint(1, 4)))
+        if len(title) <= 3 or title in seen:
+            continue
+        seen.add(title)
+        films.append((title.lower().replace(" ", "-"), title))
+    return films
+
+
+def iso_showtime(d: date, t: str) -> str:
+    return datetime.combine(d, datetime.strptime(t, "%I:%M%p").time()).isoformat()
+
+
+@lru_cache(maxsize=8)
+def calendar_data(n_showtimes: int, seed: int = 0, start: date = date(2025, 11, 3)):
+    """(films, dates, grid) with grid[(film index, date index)] = [(time, format, on_sale), ...]."""
+    rng = random.Random(seed + n_showtimes)
+    films = film_list(max(5, n_showtimes // 10), rng)
+    dates = [start + timedelta(days=i) for i in range(14)]
+    grid = {}
+    for _ in range(n_showtimes):
+        key = (rng.randrange(len(films)), rng.randrange(len(dates)))
+        grid.setdefault(key, []).append((rng.choice(TIMES), rng.choice(FORMATS), rng.random() < 0.8))
+    return films, dates, grid
+
+
+def schedule(market: str, films, dates, grid, film_range=None) -> dict:
+    """Drafthouse-style schedule payload: presentations plus sessions pointing at them."""
+    lo, hi = film_range or (0, len(films))
+    return {"market": market, "presentations": [
+        {"slug": slug, "show": {"title": title}} for slug, title in films[lo:hi]
+    ], "sessions": [
+        {"presentationSlug": films[fi][0], "showTimeClt": iso_showtime(dates[di], t), "format": fmt,
+         "status": "ONSALE" if on_sale else "SOLDOUT"}
+        for (fi, di), shows in sorted(grid.items()) if lo <= fi < hi for t, fmt, on_sale in shows
+    ]}
+
+
+def schedule_page(n_showtimes: int, market: str = "austin", page: int = 1, per_page: int = 10) -> dict:
+    """One page of the paged schedule API: `per_page` films and their sessions."""
+    films, dates, grid = calendar_data(n_showtimes)
+    pages = -(-len(films) // per_page)
+    page = max(1, min(page, pages))
+    data = schedule(market, films, dates, grid, ((page - 1) * per_page, page * per_page))
+    return {"data": data, "meta": {"page": page, "pageCount": pages, "hasMore": page < pages}}
+
+
+APP_JS = """
+const [size, market] = location.pathname.split('/').slice(2);
+const delay = new URLSearchParams(location.search).get('delay');
+const tbody = document.querySelector('tbody'), more = document.querySelector('#more');
+const dates = Array.from(document.querySelectorAll('th[data-date]'), th => th.dataset.date);
+let page = 0;
+async function load() {
+  const res = await fetch(`/api/${size}/${market}?page=${page + 1}` + (delay ? `&delay=${delay}` : ''));
+  const {data, meta} = await res.json();
+  page = meta.page;
+  for (const p of data.presentations) {
+    const tr = document.createElement('tr');
+    tr.innerHTML = `<td class="film"><a href="/${market}/film/${p.slug}"><span></span></a></td>`
+      + dates.map(d => `<td data-date="${d}"></td>`).join('');
+    tr.querySelector('span').textContent = p.show.title;
+    tr.dataset.slug = p.slug;
+    tbody.appendChild(tr);
+  }
+  for (const s of data.sessions) {
+    const [d, t] = s.showTimeClt.split('T');
+    const cell = tbody.querySelector(`tr[data-slug="${s.presentationSlug}"] td[data-date="${d}"]`);
+    const a = document.createElement('a');
+    let [h, m] = t.split(':').map(Number);
+    a.textContent = `${(h + 11) % 12 + 1}:${String(m).padStart(2, '0')}${h < 12 ? 'AM' : 'PM'}`;
+    a.className = 'showtime ' + (s.status === 'SOLDOUT' ? 'sold-out' : 'on-sale');
+    a.dataset.format = s.format;
+    a.href = `/${market}/show/${s.presentationSlug}/${d}/${a.textContent}`;
+    cell.appendChild(a);
+  }
+  more.hidden = !meta.hasMore;
+}
+more.addEventListener('click', load);
+load();
+"""
+
+
+def app_html(n_showtimes: int, market: str = "austin") -> str:
+    _, dates, _ = calendar_data(n_showtimes)
+    return (
+        "<!DOCTYPE html><html><head><title>Alamo Drafthouse</title></head><body><main>"
+        '<table class="calendar"><thead><tr><th>Film</th>'
+        + "".join(f'<th data-date="{d.isoformat()}">{d:%a %m/%d}</th>' for d in dates)
+        + "</tr></thead><tbody></tbody></table>"
+        '<button id="more" hidden>Load More</button></main>'
+        f"<script>{APP_JS}</script></body></html>"
+    )
+
+
+def embedded_json(kind: str, market: str, films, dates, grid) -> str:
+    if kind == "next":
+        data = {"props": {"pageProps": schedule(market, films, dates, grid)}}
+        return '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(data) + "</script>"
+    events = [
+        {"@type": "ScreeningEvent", "startDate": iso_showtime(dates[di], t), "videoFormat": fmt,
+         "offers": {"availability": "https://schema.org/" + ("InStock" if on_sale else "SoldOut")},
+         "workPresented": {"@type": "Movie", "name": films[fi][1], "url": f"/{market}/film/{films[fi][0]}"}}
+        for (fi, di), shows in sorted(grid.items()) for t, fmt, on_sale in shows
+    ]
+    return '<script type="application/ld+json">' + json.dumps({"@context": "https://schema.org", "@graph": events}) + "</script>"
+
+
+def calendar_html(n_showtimes: int, market: str = "austin", seed: int = 0, start: date = date(2025, 11, 3),
+                  embed: str = "", window=None, assets: bool = False) -> str:
+    """`window` = (first, last) date narrows the page to that date range, as
+    the calendar's startDate/endDate parameters do."""
+    films, dates, grid = calendar_data(n_showtimes, seed, start)
+    if window:
+        keep = [di for di, d in enumerate(dates) if window[0] <= d <= window[1]]
+        grid = {(fi, keep.index(di)): shows for (fi, di), shows in grid.items() if di in keep}
+        dates = [dates[di] for di in keep]
+        shown = sorted({fi for fi, _ in grid})
+        grid = {(shown.index(fi), di): shows for (fi, di), shows in grid.items()}
+        films = [films[fi] for fi in shown]
+
+    out = [
+        "<!DOCTYPE html><html><head><title>Alamo Drafthouse Austin</title>",
+        ASSETS_HTML if assets else "",
+        "<script>window.__APP__ = " + '"' + "x" * 20000 + '"' + ";</script></head><body>",
+        MEDIA_HTML if assets else "",
+        '<nav><a href="/austin">Alamo Drafthouse Austin</a>',
+    ]
+    for slug, title in films[:20]:
+        out.append(f'<div class="card"><a href="/{market}/film/{slug}">{escape(title)}</a><img src="/img/{slug}.jpg"></div>')
+    out.append("</nav><main><table class=\"calendar\"><thead><tr><th>Film</th>")
+    out.extend(f'<th data-date="{d.isoformat()}">{d:%a %m/%d}</th>' for d in dates)
+    out.append("</tr></thead><tbody>")
+    for fi, (slug, title) in enumerate(films):
+        out.append(f'<tr><td class="film"><a href="/{market}/film/{slug}"><span>{escape(title)}</span></a></td>')
+        for di, d in enumerate(dates):
+            shows = grid.get((fi, di), ())
+            out.append(f'<td data-date="{d.isoformat()}">')
+            for t, fmt, on_sale in shows:
+                state = "on-sale" if on_sale else "sold-out"
+                out.append(
+                    f'<a class="showtime {state}" data-format="{fmt}" '
+                    f'href="/{market}/show/{slug}/{d.isoformat()}/{t}">{t}</a>'
+                )
+            out.append("</td>")
+        out.append("</tr>")
+    out.append("</tbody></table></main><footer>" + "<p>filler</p>" * 200 + "</footer>")
+    if embed:
+        out.append(embedded_json(embed, market, films, dates, grid))
+    out.append("</body></html>")
+    return "".join(out)
+
+
+def showing_set(cal) -> set:
+    """Showings as comparable tuples, for checking two extractions agree."""
+    return {sh.key + (sh.on_sale,) for sh in cal.showings or ()}
+
+
+def write_fixtures(sizes, directory: str = FIXTURE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for n in sizes:
+        path = os.path.join(directory, f"calendar_{n}.html")
+        with open(path, "w") as f:
+            f.write(calendar_html(n))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    for p in write_fixtures([int(a) for a in sys.argv[1:]] or [50, 500, 5000]):
+        print(p)
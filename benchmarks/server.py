@@ -0,0 +1,104 @@
+"""
+Local HTTP stand-in for drafthouse.com, serving fixture calendars.
+
+    /<size>/<market>?showCalendar=true   synthetic calendar with <size> showtimes
+        [&startDate=YYYY-MM-DD&endDate=YYYY-MM-DD]   ...narrowed to those dates
+    /app/<size>/<market>                 the same calendar rendered client-side from /api
+    /api/<size>/<market>?page=<n>        one page of its schedule JSON
+    /saved/<name>                        benchmarks/fixtures/<name>.html as recorded
+    /static/<name>, /img/<name>          the page's assets, with &assets=1 on the calendar
+
+Any route takes &delay=<ms> to answer that much later; the /app page passes
+its own on to its /api requests, so Load More responses are slow too.
+
+Responses carry an ETag and answer If-None-Match with 304 unless the server
+was started with conditional=False (to exercise the content-hash path).
+
+Runs in a background thread so a benchmark can point alamo_alert at it:
+
+    with FixtureServer() as srv:
+        url = srv.url("/500/austin?showCalendar=true")
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fixtures import FIXTURE_DIR, app_html, asset_body, calendar_html, schedule_page
+
+
+@lru_cache(maxsize=None)
+def _page(size: int, market: str, start: str = "", end: str = "", assets: bool = False) -> bytes:
+    window = (date.fromisoformat(start), date.fromisoformat(end)) if start and end else None
+    return calendar_html(size, market, window=window, assets=assets).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.strip("/").split("/")
+        body, ctype = None, "text/html; charset=utf-8"
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if query.get("delay", "").isdigit():
+            time.sleep(int(query["delay"]) / 1000)
+        if len(path) == 2 and path[0].isdigit():
+            body = _page(int(path[0]), path[1], query.get("startDate", ""), query.get("endDate", ""),
+                         query.get("assets") == "1")
+        elif len(path) >= 2 and path[0] in ("static", "img"):
+            body = asset_body("/".join(path[1:]))
+            ctype = mimetypes.guess_type(path[-1])[0] or "application/octet-stream"
+        elif len(path) == 3 and path[0] == "app" and path[1].isdigit():
+            body = app_html(int(path[1]), path[2]).encode()
+        elif len(path) == 3 and path[0] == "api" and path[1].isdigit():
+            page = int(query.get("page", "1"))
+            body, ctype = json.dumps(schedule_page(int(path[1]), path[2], page)).encode(), "application/json"
+        elif len(path) == 2 and path[0] == "saved":
+            fname = os.path.join(FIXTURE_DIR, os.path.basename(path[1]) + ".html")
+            if os.path.exists(fname):
+                with open(fname, "rb") as f:
+                    body = f.read()
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.server.conditional and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        if self.server.conditional:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, conditional: bool = True):
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.conditional = conditional
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,139 @@
+"""
+Shared fixtures. alamo_alert reads its config and opens its log file at
+import, so the environment is pinned and the import happens in a scratch
+directory before any test module loads it.
+
+    pip install pytest && python -m pytest tests
+"""
+
+import os
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+_scratch = tempfile.mkdtemp(prefix="alamo-tests-")
+os.environ.update({
+    "THEATERS": "austin",
+    "FETCH_MODE": "http",
+    "ALAMO_API_URL": "",
+    "CACHE_DB": os.path.join(_scratch, "cache.db"),
+    "METRICS_FILE": "",
+    "EMAIL_ENABLED": "false",
+    "NOTIFY_FILE": "",
+    "SHARD_DAYS": "0",
+})
+_cwd = os.getcwd()
+os.chdir(_scratch)
+try:
+    import alamo_alert  # noqa: E402,F401
+finally:
+    os.chdir(_cwd)
+
+from fixtures import showing_set  # noqa: E402
+from server import FixtureServer  # noqa: E402
+
+
+def snapshot(cal):
+    """Films by slug and every showing: what two ways of reading a calendar should agree on."""
+    return {slug: f.title for slug, f in cal.films.items()}, showing_set(cal)
+
+
+@pytest.fixture(scope="session")
+def server():
+    with FixtureServer() as srv:
+        yield srv
+
+
+@pytest.fixture(scope="session")
+def plain_server():
+    """No ETags: only the content hash can short-circuit."""
+    with FixtureServer(conditional=False) as srv:
+        yield srv
+
+
+@pytest.fixture
+def needs_chrome():
+    """Skip unless there is a Chrome for get_driver() to start."""
+    if not any(shutil.which(b) for b in ("google-chrome", "chromium", "chromium-browser", "chrome")):
+        pytest.skip("Chrome is not installed")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = alamo_alert.open_cache(str(tmp_path / "cache.db"))
+    yield conn
+    conn.close()
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH PLAIN, MAIL/RCPT/DATA, NOOP, QUIT."""
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        srv = self.server
+        srv.connections += 1
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stub")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "HELO":
+                self.reply("250 stub")
+            elif verb == "AUTH":
+                self.reply("235 ok")
+            elif verb == "MAIL":
+                if srv.fail_mail:
+                    self.reply("451 try again later")
+                else:
+                    self.reply("250 ok")
+            elif verb in ("RCPT", "RSET", "NOOP"):
+                self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk.decode())
+                srv.messages.append("".join(data))
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class SmtpStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail_mail = False
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def address(self) -> str:
+        return "%s:%d" % self.server_address[:2]
+
+
+@pytest.fixture
+def smtp_stub():
+    stub = SmtpStub()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
@@ -0,0 +1,83 @@
+"""Resource blocking: patterns, the per-run network tally, and what they save on the fixture site."""
+
+import fnmatch
+import logging
+import re
+import urllib.request
+
+import alamo_alert as aa
+from bench_blocking import load_page
+from fixtures import ASSETS, POSTER_BYTES, calendar_html
+
+
+def event(method, request_id, **params):
+    return {"method": method, "params": {"requestId": request_id, **params}}
+
+
+def test_patterns_follow_categories(monkeypatch):
+    monkeypatch.setattr(aa, "BLOCK_RESOURCES", "images, trackers")
+    patterns = aa.blocked_url_patterns()
+    assert "*.png" in patterns and "*doubleclick.net*" in patterns
+    assert not any(p.endswith((".woff2", ".css")) for p in patterns)
+
+
+def test_unknown_category_is_reported(monkeypatch, caplog):
+    monkeypatch.setattr(aa, "BLOCK_RESOURCES", "images,css")
+    with caplog.at_level(logging.WARNING):
+        patterns = aa.blocked_url_patterns()
+    assert patterns == aa.BLOCK_PATTERNS["images"]
+    assert "css" in caplog.text
+
+
+def test_network_usage_tally(caplog):
+    events = [
+        event("Network.requestWillBeSent", "1", request={"url": "https://drafthouse.com/austin"}),
+        event("Network.loadingFinished", "1", encodedDataLength=2048),
+        event("Network.requestWillBeSent", "2", request={"url": "https://x.test/a.png"}),
+        event("Network.loadingFailed", "2", blockedReason="inspector"),
+        event("Network.requestWillBeSent", "3", request={"url": "https://drafthouse.com/_next/app.css"}),
+        event("Network.loadingFailed", "3", blockedReason="inspector"),
+        event("Network.requestWillBeSent", "4", request={"url": "https://x.test/api"}),
+        event("Network.loadingFailed", "4", errorText="net::ERR_FAILED"),
+    ]
+    with caplog.at_level(logging.WARNING):
+        usage = aa.network_usage(events)
+    assert usage == {"allowed": 1, "allowed_bytes": 2048, "blocked": 2, "failed": 1}
+    assert "Critical request was blocked: https://drafthouse.com/_next/app.css" in caplog.text
+
+
+ASSET_URL_RE = re.compile(r'(?:src|href)="(/(?:static|img)/[^"]+)"|url\((/static/[^)]+)\)')
+
+
+def page_resources(html):
+    return [tag or css for tag, css in ASSET_URL_RE.findall(html)]
+
+
+def blocked(url, patterns):
+    # CDP's setBlockedURLs patterns: "*" matches any run of characters
+    return any(fnmatch.fnmatchcase(url, p) for p in patterns)
+
+
+def test_default_categories_leave_only_the_page_itself(server, monkeypatch):
+    monkeypatch.setattr(aa, "BLOCK_RESOURCES", "images,fonts,media,trackers")
+    patterns = aa.blocked_url_patterns()
+    resources = page_resources(calendar_html(500, assets=True))
+    assert len(resources) == len(ASSETS) + 20  # plus a poster per card
+    kept = [r for r in resources if not blocked(server.url(r), patterns)]
+    assert kept == ["/static/site.css", "/static/app.js"]
+
+    def size(path):
+        return len(urllib.request.urlopen(server.url(path)).read())
+
+    saved = sum(size(r) for r in resources) - sum(size(r) for r in kept)
+    assert saved == sum(ASSETS.values()) - ASSETS["site.css"] - ASSETS["app.js"] + 20 * POSTER_BYTES
+
+
+def test_blocking_saves_bytes_and_time_in_chrome(needs_chrome, server, monkeypatch):
+    url = server.url("/500/austin?showCalendar=true&assets=1")
+    monkeypatch.setattr(aa, "BLOCK_RESOURCES", "")
+    off = load_page(aa, url)
+    monkeypatch.setattr(aa, "BLOCK_RESOURCES", "images,fonts,media,trackers")
+    on = load_page(aa, url)
+    assert on["blocked"] >= len(ASSETS) - 2 and on["links"] == off["links"]
+    assert off["allowed_bytes"] - on["allowed_bytes"] >= 0.9 * (sum(ASSETS.values()) - 64_000)
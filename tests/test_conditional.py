@@ -0,0 +1,55 @@
+"""Conditional fetch: 304 and identical-payload short-circuits, and validator persistence."""
+
+import alamo_alert as aa
+from fixtures import calendar_html
+
+
+def commit(conn, fetch_cache):
+    with conn:
+        aa.save_fetch_cache(conn, fetch_cache)
+    return aa.load_fetch_cache(conn)
+
+
+def test_not_modified_short_circuits(server, conn):
+    url = server.url("/50/austin?showCalendar=true")
+    fetch_cache = aa.load_fetch_cache(conn)
+    assert aa.fetch_calendar_http("austin", url, fetch_cache)
+    assert fetch_cache.updated[url]["etag"]
+
+    fetch_cache = commit(conn, fetch_cache)
+    cal = aa.fetch_calendar_http("austin", url, fetch_cache)
+    assert cal.unchanged and not cal.films
+    assert not fetch_cache.updated
+
+
+def test_identical_payload_short_circuits_without_etag(plain_server, conn):
+    url = plain_server.url("/50/austin?showCalendar=true")
+    fetch_cache = aa.load_fetch_cache(conn)
+    aa.fetch_calendar_http("austin", url, fetch_cache)
+    assert fetch_cache.updated[url]["etag"] is None and fetch_cache.updated[url]["hash"]
+
+    cal = aa.fetch_calendar_http("austin", url, commit(conn, fetch_cache))
+    assert cal.unchanged
+
+
+def test_changed_payload_is_parsed(plain_server):
+    url = plain_server.url("/500/austin?showCalendar=true")
+    last_run = aa.payload_digest(calendar_html(50).encode(), html=True)
+    fetch_cache = aa.FetchCache({url: {"etag": None, "last_modified": None, "hash": last_run}})
+    cal = aa.fetch_calendar_http("austin", url, fetch_cache)
+    assert cal and not cal.unchanged
+    assert fetch_cache.updated[url]["hash"] != last_run
+
+
+def test_uncommitted_validators_are_not_used(server, conn):
+    url = server.url("/50/austin?showCalendar=true")
+    aa.fetch_calendar_http("austin", url, aa.load_fetch_cache(conn))
+    # The run died before update_state: the next one must fetch in full
+    assert aa.fetch_calendar_http("austin", url, aa.load_fetch_cache(conn))
+
+
+def test_html_digest_ignores_noise_outside_tables():
+    a = b"<html><script>token=1</script><table><tr><td>x</td></tr></table></html>"
+    b = b"<html><script>token=2</script><table><tr><td>x</td></tr></table></html>"
+    assert aa.payload_digest(a, html=True) == aa.payload_digest(b, html=True)
+    assert aa.payload_digest(a) != aa.payload_digest(b)
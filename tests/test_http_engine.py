@@ -0,0 +1,34 @@
+"""HTTP engine against the local stand-in: same films and showings as parsing the page directly."""
+
+import pytest
+
+import alamo_alert as aa
+from conftest import showing_set
+from fixtures import calendar_html
+
+
+@pytest.mark.parametrize("size", [50, 500])
+def test_http_fetch_matches_page_parse(server, size):
+    cal = aa.fetch_calendar_http("austin", server.url(f"/{size}/austin?showCalendar=true"))
+    ref = aa.extract_soup(calendar_html(size))
+    assert cal.titles == ref.titles
+    assert showing_set(cal) == showing_set(ref)
+
+
+def test_html_backends_agree():
+    html = calendar_html(500)
+    ref = aa.extract_soup(html)
+    for name in ("strainer", "lxml"):
+        cal = aa.HTML_EXTRACTORS[name](html)
+        assert {s: f.title for s, f in cal.films.items()} == {s: f.title for s, f in ref.films.items()}
+        assert showing_set(cal) == showing_set(ref)
+
+
+def test_fetch_movie_titles_over_http(server):
+    titles = aa.fetch_movie_titles("austin", server.url("/50/austin?showCalendar=true"))
+    assert titles == aa.extract_soup(calendar_html(50)).titles
+
+
+def test_unreachable_page_returns_empty_calendar(server):
+    cal = aa.fetch_calendar_http("austin", server.url("/nope"))
+    assert not cal and not cal.unchanged
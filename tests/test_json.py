@@ -0,0 +1,61 @@
+"""Embedded JSON extraction: API payloads, Next.js state and JSON-LD agree with the table."""
+
+import pytest
+
+import alamo_alert as aa
+from conftest import snapshot
+from fixtures import calendar_data, calendar_html, schedule
+
+
+@pytest.fixture(scope="module")
+def table():
+    return snapshot(aa.extract_table(calendar_html(200)))
+
+
+def test_schedule_payload_matches_table(table):
+    films, dates, grid = calendar_data(200)
+    assert snapshot(aa.calendar_from_json(schedule("austin", films, dates, grid))) == table
+
+
+@pytest.mark.parametrize("embed, extract", [("next", aa.extract_state), ("jsonld", aa.extract_jsonld)])
+def test_embedded_blocks_match_table(table, embed, extract):
+    assert snapshot(extract(calendar_html(200, embed=embed))) == table
+
+
+def test_sold_out_sessions_are_kept_off_sale(table):
+    _, showings = table
+    assert any(not on_sale for *_, on_sale in showings) and any(on_sale for *_, on_sale in showings)
+
+
+def test_window_assignment_state():
+    html = ('<script>window.__INITIAL_STATE__ = {"films": [{"slug": "alien", "title": " Alien "}], '
+            '"sessions": [{"filmSlug": "alien", "startsAt": "2025-11-03T19:00:00", "status": "SOLD_OUT"}]};</script>')
+    cal = aa.extract_state(html)
+    assert snapshot(cal) == ({"alien": "Alien"}, {("alien", "2025-11-03", "7:00PM", "", False)})
+
+
+def test_pages_without_state_give_nothing():
+    html = '<script src="/app.js"></script><script>window.__APP__ = "xx";</script><script type="application/json">{bad</script>'
+    assert not aa.extract_state(html) and not aa.extract_jsonld(html)
+
+
+def test_titles_only_payload_has_no_showings():
+    cal = aa.calendar_from_json({"presentations": [{"slug": "alien", "show": {"title": "Alien"}}]})
+    assert cal.titles == {"Alien"} and cal.showings is None
+
+
+def test_session_for_unknown_film_is_dropped():
+    cal = aa.calendar_from_json({"sessions": [{"presentationSlug": "ghost", "showTimeClt": "2025-11-03T19:00:00"}]})
+    assert not cal and cal.showings is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-11-03T19:00:00", ("2025-11-03", "7:00PM")),
+    ("2025-11-03T11:59:00Z", ("2025-11-03", "11:59AM")),
+    ("2025-11-03T00:05:00-06:00", ("2025-11-03", "12:05AM")),
+    ("2025-11-03", None),
+    ("tonight", None),
+    (None, None),
+])
+def test_showtime_from_iso(value, expected):
+    assert aa.showtime_from_iso(value) == expected
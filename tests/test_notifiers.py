@@ -0,0 +1,128 @@
+"""Notifier backends against a local webhook stand-in: payloads, spacing, keep-alive, errors."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import alamo_alert as aa
+
+
+class HookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        srv = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        srv.requests.append({
+            "path": self.path, "headers": dict(self.headers), "json": json.loads(body),
+            "port": self.client_address[1], "at": time.monotonic(),
+        })
+        self.send_response(srv.status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        # Drop the kept-alive connection without telling the client, like an idle timeout
+        self.close_connection = srv.drop
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hook():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), HookHandler)
+    srv.daemon_threads = True
+    srv.requests, srv.status, srv.drop = [], 200, False
+    srv.url = "http://%s:%d" % srv.server_address[:2]
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def sent(notifier, subject="New at Alamo: Alien", body="Alien (1979)"):
+    try:
+        notifier.send(subject, body)
+    finally:
+        notifier.close()
+
+
+def test_webhook_payload(hook):
+    sent(aa.WebhookNotifier(hook.url + "/hooks/alamo?k=1"))
+    [req] = hook.requests
+    assert req["path"] == "/hooks/alamo?k=1"
+    assert req["headers"]["Content-Type"] == "application/json"
+    assert req["json"] == {"source": "alamo_alert", "subject": "New at Alamo: Alien", "body": "Alien (1979)"}
+
+
+def test_discord_payload_is_clipped(hook):
+    sent(aa.DiscordNotifier(hook.url + "/api/webhooks/1/x"), body="x" * 5000)
+    content = hook.requests[0]["json"]["content"]
+    assert content.startswith("**New at Alamo: Alien**\nxxx")
+    assert len(content) == aa.DiscordNotifier.max_len and content.endswith("…")
+
+
+def test_slack_payload(hook):
+    sent(aa.SlackNotifier(hook.url + "/services/T/B/x"))
+    assert hook.requests[0]["json"] == {"text": "*New at Alamo: Alien*\nAlien (1979)"}
+
+
+def test_ntfy_publishes_to_root_with_topic(hook):
+    sent(aa.NtfyNotifier(hook.url + "/alamo-alerts", token="tk_123"))
+    [req] = hook.requests
+    assert req["path"] == "/"
+    assert req["headers"]["Authorization"] == "Bearer tk_123"
+    assert req["json"]["topic"] == "alamo-alerts"
+    assert req["json"]["title"] == "New at Alamo: Alien" and req["json"]["message"] == "Alien (1979)"
+
+
+def test_sends_are_spaced_and_share_a_connection(hook):
+    notifier = aa.DiscordNotifier(hook.url + "/api/webhooks/1/x")
+    notifier.min_interval = 0.3
+    try:
+        notifier.send("one", "a")
+        notifier.send("two", "b")
+    finally:
+        notifier.close()
+    first, second = hook.requests
+    assert second["at"] - first["at"] >= 0.3
+    assert first["port"] == second["port"]
+
+
+def test_builtin_rate_limits():
+    assert aa.DiscordNotifier.min_interval == 2.0
+    assert aa.SlackNotifier.min_interval == aa.NtfyNotifier.min_interval == 1.0
+
+
+def test_stale_pooled_connection_is_retried(hook):
+    hook.drop = True
+    notifier = aa.WebhookNotifier(hook.url + "/h")
+    try:
+        notifier.send("one", "a")
+        time.sleep(0.1)
+        notifier.send("two", "b")
+    finally:
+        notifier.close()
+    assert [r["json"]["subject"] for r in hook.requests] == ["one", "two"]
+
+
+def test_error_status_fails_the_send(hook):
+    hook.status = 429
+    with pytest.raises(RuntimeError, match="HTTP 429"):
+        sent(aa.SlackNotifier(hook.url + "/s"))
+
+
+def test_file_notifier(tmp_path):
+    path = tmp_path / "alerts.txt"
+    aa.FileNotifier(str(path)).send("New at Alamo: Alien", "Alien (1979)")
+    text = path.read_text()
+    assert "New at Alamo: Alien" in text and "Alien (1979)" in text
+
+
+def test_only_configured_backends_are_enabled():
+    assert aa.make_notifiers() == []
+    assert aa.WebhookNotifier("http://x.test/h").enabled()
+    assert not aa.NtfyNotifier("").enabled()
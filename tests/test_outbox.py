@@ -0,0 +1,137 @@
+"""Outbox: alerts are queued in the state transaction and delivered with retry/backoff."""
+
+import asyncio
+import email
+import sqlite3
+import time
+
+import pytest
+
+import alamo_alert as aa
+
+
+def outbox(conn):
+    return conn.execute("SELECT subject, attempts, next_attempt, dead, last_error FROM outbox ORDER BY id").fetchall()
+
+
+def queue(conn, *subjects, channel="email"):
+    with conn:
+        for subject in subjects:
+            aa.enqueue_alert(conn, [channel], subject, f"body of {subject}")
+
+
+def flush(conn, notifier):
+    return asyncio.run(aa.flush_channel(conn, notifier))
+
+
+@pytest.fixture
+def mail(monkeypatch, smtp_stub):
+    monkeypatch.setattr(aa, "EMAIL_SMTP", smtp_stub.address)
+    monkeypatch.setattr(aa, "EMAIL_STARTTLS", False)
+    monkeypatch.setattr(aa, "EMAIL_FROM", "alerts@example.test")
+    monkeypatch.setattr(aa, "EMAIL_TO", "me@example.test")
+    monkeypatch.setattr(aa, "EMAIL_PASS", "secret")
+    monkeypatch.setattr(aa, "OUTBOX_RETRY_BASE", 60)
+    mailer = aa.Mailer()
+    yield mailer
+    mailer.close()
+
+
+class Failing(aa.Notifier):
+    channel = "email"
+
+    def send(self, subject, body):
+        raise RuntimeError("down")
+
+
+def test_alert_is_queued_with_the_state_change(conn):
+    cal = aa.Calendar({"alien": aa.Film("alien", "Alien")})
+    assert aa.update_state(conn, {"austin": cal}, None, ["email", "webhook"]) == 1
+    assert sorted(row[0] for row in conn.execute("SELECT channel FROM outbox")) == ["email", "webhook"]
+    assert conn.execute("SELECT alerted FROM films WHERE slug = 'alien'").fetchone() == (1,)
+
+
+def test_failed_state_write_drops_the_queued_alert(conn, monkeypatch):
+    def broken_save(conn, cache):
+        with conn:
+            raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(aa, "save_cache", broken_save)
+    with pytest.raises(sqlite3.OperationalError):
+        aa.update_state(conn, {"austin": aa.Calendar({"alien": aa.Film("alien", "Alien")})}, None, ["email"])
+    assert outbox(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM films").fetchone() == (0,)
+
+
+def test_queued_alerts_go_out_as_one_message(conn, mail, smtp_stub):
+    queue(conn, "New at Alamo: Alien", "New at Alamo: Heat")
+    assert flush(conn, mail) == 2
+    assert outbox(conn) == []
+    assert len(smtp_stub.messages) == 1
+    msg = email.message_from_string(smtp_stub.messages[0])
+    assert msg["Subject"] == "New at Alamo: Heat (+1 earlier alert(s))"
+    body = msg.get_payload()[0].get_payload(decode=True).decode()
+    assert "body of New at Alamo: Alien" in body and "body of New at Alamo: Heat" in body
+
+
+def test_smtp_session_is_reused(conn, mail, smtp_stub):
+    for subject in ("one", "two"):
+        queue(conn, subject)
+        assert flush(conn, mail) == 1
+    assert len(smtp_stub.messages) == 2
+    assert smtp_stub.connections == 1
+
+
+def test_failed_send_backs_off_then_delivers(conn, mail, smtp_stub):
+    queue(conn, "New at Alamo: Alien")
+    smtp_stub.fail_mail = True
+    before = time.time()
+    assert flush(conn, mail) == 0
+    [(_, attempts, next_attempt, dead, error)] = outbox(conn)
+    assert (attempts, dead) == (1, 0) and "451" in error
+    assert before + 60 <= next_attempt <= time.time() + 60
+
+    assert flush(conn, mail) == 0  # not due yet: no attempt made
+    assert outbox(conn)[0][1] == 1
+
+    with conn:
+        conn.execute("UPDATE outbox SET next_attempt = 0")
+    assert flush(conn, mail) == 0
+    [(_, attempts, next_attempt, _, _)] = outbox(conn)
+    assert attempts == 2 and next_attempt >= time.time() + 119
+
+    smtp_stub.fail_mail = False
+    with conn:
+        conn.execute("UPDATE outbox SET next_attempt = 0")
+    assert flush(conn, mail) == 1
+    assert outbox(conn) == [] and len(smtp_stub.messages) == 1
+
+
+def test_alert_goes_dead_after_max_attempts(conn, monkeypatch):
+    monkeypatch.setattr(aa, "OUTBOX_MAX_ATTEMPTS", 2)
+    queue(conn, "New at Alamo: Alien")
+    for _ in range(2):
+        with conn:
+            conn.execute("UPDATE outbox SET next_attempt = 0")
+        flush(conn, Failing())
+    assert outbox(conn)[0][1:4:2] == (2, 1)
+    assert flush(conn, Failing()) == 0
+
+
+def test_hung_send_times_out(conn):
+    class Hung(aa.Notifier):
+        channel = "email"
+        timeout = 0.2
+        was_reset = False
+
+        def send(self, subject, body):
+            time.sleep(1)
+
+        def reset(self):
+            self.was_reset = True
+
+    notifier = Hung()
+    queue(conn, "New at Alamo: Alien")
+    assert flush(conn, notifier) == 0
+    assert notifier.was_reset
+    assert outbox(conn)[0][4] == "timed out after 0.2s"
@@ -0,0 +1,77 @@
+"""Paged schedule APIs: reading the paging verdict, working out the parameter, fetching the rest."""
+
+import logging
+
+import pytest
+
+import alamo_alert as aa
+from conftest import snapshot
+from fixtures import calendar_html, schedule_page
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"meta": {"hasMore": True}}, True),
+    ({"pagination": {"has_more": False, "page": 1, "pageCount": 5}}, False),
+    ({"pageInfo": {"nextCursor": "abc"}}, True),
+    ({"next": None}, False),
+    ({"meta": {"page": 2, "totalPages": 3}}, True),
+    ({"meta": {"page": 3, "totalPages": 3}}, False),
+    ({"presentations": []}, None),
+    ([{"page": 1}], None),
+])
+def test_more_pages(data, expected):
+    assert aa.more_pages(data) is expected
+
+
+def test_one_based_page_number():
+    plan = aa.Pagination.discover(["https://x.test/api?page=1"], {"meta": {"page": 1, "pageCount": 3}})
+    assert (plan.param, plan.value, plan.step, plan.left) == ("page", 1, 1, 2)
+    assert plan.url(2) == "https://x.test/api?page=3"
+
+
+def test_zero_based_page_number():
+    plan = aa.Pagination.discover(["https://x.test/api?page=0"], {"meta": {"page": 0, "pageCount": 3}})
+    assert plan.left == 2 and plan.url(1) == "https://x.test/api?page=1"
+
+
+def test_zero_based_second_request():
+    urls = ["https://x.test/api?page=0", "https://x.test/api?page=1"]
+    plan = aa.Pagination.discover(urls, {"meta": {"page": 1, "pageCount": 3}})
+    assert plan.left == 1 and plan.url(1) == "https://x.test/api?page=2"
+
+
+def test_cache_buster_does_not_win():
+    urls = ["https://x.test/api?_=1700000000&page=1", "https://x.test/api?_=1700000005&page=2"]
+    plan = aa.Pagination.discover(urls, {"hasMore": True})
+    assert (plan.param, plan.step, plan.left) == ("page", 1, None)
+    assert plan.url(1) == "https://x.test/api?_=1700000005&page=3"
+
+
+def test_offset_steps_by_limit():
+    plan = aa.Pagination.discover(["https://x.test/api?offset=0&limit=10"], {"total": 25, "hasMore": True})
+    assert (plan.param, plan.step, plan.left) == ("offset", 10, 2)
+    assert plan.url(2) == "https://x.test/api?limit=10&offset=20"
+
+
+def test_cursor_only_is_not_discoverable():
+    assert aa.Pagination.discover(["https://x.test/api?cursor=abc"], {"nextCursor": "def"}) is None
+
+
+@pytest.mark.parametrize("left", [4, None])
+def test_fetch_pages_from_server(server, left):
+    plan = aa.Pagination(server.url("/api/500/austin?page=1"), "page", 1, 1, left)
+    pages = aa.fetch_pages(plan)
+    assert [p["meta"]["page"] for p in pages] == [2, 3, 4, 5]
+    assert pages == [schedule_page(500, page=p) for p in range(2, 6)]
+
+
+def test_paginate_gives_up_on_a_failed_page(server):
+    assert aa.paginate("austin", [server.url("/api/500/nowhere/x?page=1")], {"meta": {"page": 1, "pageCount": 3}}) is None
+
+
+def test_http_engine_reads_every_page(server, monkeypatch, caplog):
+    monkeypatch.setattr(aa, "API_URL", server.url("/api/500/{market}?page=1"))
+    with caplog.at_level(logging.INFO):
+        cal = aa.fetch_calendar_http("austin", server.url("/500/austin?showCalendar=true"))
+    assert "4 more page(s)" in caplog.text
+    assert snapshot(cal) == snapshot(aa.extract_table(calendar_html(500)))
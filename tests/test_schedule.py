@@ -0,0 +1,97 @@
+"""Adaptive polling: learning from genuine arrivals only, and fitting the daily budget."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import alamo_alert as aa
+
+# Three weeks back, so the arrivals below fall on the same weekday
+START = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=21)
+SEEDED = START.replace(hour=3)
+ARRIVALS = [START.replace(hour=20) + timedelta(days=7 * w) for w in (1, 2)]
+QUIET = START.replace(hour=9) + timedelta(days=3)
+
+
+def scrape(conn, titles, when):
+    cache = aa.load_cache(conn, ["austin"])
+    cache["austin"].apply({aa.slugify(t): aa.Film(aa.slugify(t), t) for t in titles}, when.isoformat(timespec="seconds"))
+    aa.save_cache(conn, cache)
+
+
+def learned(conn):
+    schedule = aa.AdaptiveSchedule(1800)
+    schedule.learn(conn)
+    return schedule
+
+
+@pytest.fixture
+def history(conn):
+    showing = [f"Film {n}" for n in range(150)]
+    scrape(conn, showing, SEEDED)
+    for w, when in enumerate(ARRIVALS):
+        showing += [f"New {w} {n}" for n in range(3)]
+        scrape(conn, showing, when)
+    return conn
+
+
+def test_first_run_is_not_an_arrival_burst(history):
+    schedule = learned(history)
+    assert schedule.ideal_interval(SEEDED) == schedule.ideal_interval(QUIET)
+    assert schedule.ideal_interval(ARRIVALS[0]) < 1800 < schedule.ideal_interval(QUIET)
+
+
+def test_markets_saved_before_first_run_was_recorded(history):
+    with history:
+        history.execute("DELETE FROM meta WHERE key = 'first_run:austin'")
+    schedule = learned(history)
+    assert schedule.ideal_interval(SEEDED) == schedule.ideal_interval(QUIET)
+
+
+def test_first_run_is_pinned(history):
+    scrape(history, ["Only Now"], datetime.now())  # every seeded film goes missing
+    value = history.execute("SELECT value FROM meta WHERE key = 'first_run:austin'").fetchone()[0]
+    assert value == SEEDED.isoformat(timespec="seconds")
+
+
+def test_json_import_teaches_nothing(conn, tmp_path):
+    path = tmp_path / "seen_titles.json"
+    path.write_text(json.dumps([f"Film {n}" for n in range(150)]))
+    aa.import_json_cache(conn, str(path))
+    assert conn.execute("SELECT COUNT(*) FROM films").fetchone() == (150,)
+    assert len(set(learned(conn).heat)) == 1
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(aa, "POLL_JITTER", 0)
+    monkeypatch.setattr(aa, "POLL_MIN_INTERVAL", 300)
+    monkeypatch.setattr(aa, "POLL_MAX_INTERVAL", 7200)
+    monkeypatch.setattr(aa, "POLL_DAILY_BUDGET", 30)
+
+
+NOON = datetime(2025, 11, 3, 12, 0)
+
+
+def test_interval_within_budget(budget):
+    # 12 hours left at 1800s is 24 polls; 30 remain
+    assert aa.AdaptiveSchedule(1800).next_interval(NOON, 0) == 1800
+
+
+def test_budget_stretches_every_interval(budget):
+    # Same 24 polls wanted, only 12 left
+    assert aa.AdaptiveSchedule(1800).next_interval(NOON, 18) == 3600
+
+
+def test_spent_budget_waits_for_midnight(budget):
+    assert 12 * 3600 <= aa.AdaptiveSchedule(1800).next_interval(NOON, 30) <= 12 * 3600 + 300
+
+
+def test_hot_hours_poll_faster_within_bounds(budget):
+    schedule = aa.AdaptiveSchedule(1800)
+    hot = schedule.hour_of_week(NOON)
+    schedule.heat = [0.1] * 168
+    schedule.heat[hot] = 10.0
+    assert schedule.ideal_interval(NOON) == 300
+    assert schedule.ideal_interval(NOON + timedelta(hours=3)) == 7200
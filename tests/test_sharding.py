@@ -0,0 +1,144 @@
+"""Date-window sharding: aligned windows, merged results, far windows from cache, no caching of empties."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import alamo_alert as aa
+from conftest import snapshot
+from fixtures import calendar_html
+
+TODAY = date(2025, 11, 4)
+
+
+def next_run(fetch_cache):
+    """What the next run loads once this one's updates are committed."""
+    return aa.FetchCache({**fetch_cache.entries, **fetch_cache.updated},
+                         shards={**fetch_cache.shards, **fetch_cache.updated_shards})
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(aa, "SHARD_DAYS", 7)
+    monkeypatch.setattr(aa, "SHARD_WINDOWS", 2)
+    monkeypatch.setattr(aa, "SHARD_HOT_DAYS", 3)
+    monkeypatch.setattr(aa, "SHARD_MAX_AGE", 24)
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Window start dates fetch_page was asked for, in call order."""
+    calls = []
+    fetch_page = aa.fetch_page
+
+    def spy(market, url, *args, **kwargs):
+        calls.append(url.split("startDate=")[1][:10])
+        return fetch_page(market, url, *args, **kwargs)
+
+    monkeypatch.setattr(aa, "fetch_page", spy)
+    return calls
+
+
+def test_weekly_windows_start_on_monday(sharded):
+    weeks = [(date(2025, 11, 3), date(2025, 11, 9)), (date(2025, 11, 10), date(2025, 11, 16))]
+    assert aa.shard_windows(TODAY) == weeks
+    assert aa.shard_windows(date(2025, 11, 9)) == weeks
+
+
+def test_daily_windows(monkeypatch):
+    monkeypatch.setattr(aa, "SHARD_DAYS", 1)
+    monkeypatch.setattr(aa, "SHARD_WINDOWS", 3)
+    assert aa.shard_windows(TODAY) == [(TODAY + timedelta(days=i),) * 2 for i in range(3)]
+
+
+def test_shard_url():
+    start, end = date(2025, 11, 3), date(2025, 11, 9)
+    assert aa.shard_url("https://x.test/austin", start, end) == \
+        "https://x.test/austin?startDate=2025-11-03&endDate=2025-11-09"
+    assert aa.shard_url("https://x.test/austin?showCalendar=true", start, end) == \
+        "https://x.test/austin?showCalendar=true&startDate=2025-11-03&endDate=2025-11-09"
+
+
+def test_merged_shards_match_full_calendar(server, sharded, fetched):
+    cal = aa.fetch_sharded("austin", server.url("/500/austin?showCalendar=true"), None, aa.FetchCache(), TODAY)
+    assert sorted(fetched) == ["2025-11-03", "2025-11-10"]
+    assert snapshot(cal) == snapshot(aa.extract_table(calendar_html(500)))
+
+
+def test_far_window_comes_from_cache(server, sharded, fetched):
+    url = server.url("/500/austin?showCalendar=true")
+    fetch_cache = aa.FetchCache()
+    aa.fetch_sharded("austin", url, None, fetch_cache, TODAY)
+    fetched.clear()
+
+    cal = aa.fetch_sharded("austin", url, None, next_run(fetch_cache), TODAY)
+    assert fetched == ["2025-11-03"]
+    assert cal.unchanged
+
+
+def test_stale_far_window_is_fetched_again(server, sharded, fetched):
+    url = server.url("/500/austin?showCalendar=true")
+    fetch_cache = aa.FetchCache()
+    aa.fetch_sharded("austin", url, None, fetch_cache, TODAY)
+    fetched.clear()
+
+    again = next_run(fetch_cache)
+    key = ("austin", "2025-11-10")
+    old = (datetime.now() - timedelta(hours=25)).isoformat(timespec="seconds")
+    again.shards[key] = (old, again.shards[key][1])
+    aa.fetch_sharded("austin", url, None, again, TODAY)
+    assert sorted(fetched) == ["2025-11-03", "2025-11-10"]
+
+
+def test_empty_shard_is_not_cached(sharded, monkeypatch):
+    full = aa.extract_table(calendar_html(50))
+
+    def fetch_page(market, url, *args, **kwargs):
+        return full if "startDate=2025-11-03" in url else aa.Calendar()
+
+    monkeypatch.setattr(aa, "fetch_page", fetch_page)
+    fetch_cache = aa.FetchCache()
+    cal = aa.fetch_sharded("austin", "https://x.test/austin", None, fetch_cache, TODAY)
+    assert snapshot(cal) == snapshot(full)
+    assert list(fetch_cache.updated_shards) == [("austin", "2025-11-03")]
+    assert next_run(fetch_cache).shard("austin", "2025-11-10") == (None, None)
+
+
+def test_empty_shard_keeps_the_last_fetch(sharded, monkeypatch):
+    full = aa.extract_table(calendar_html(50))
+    fetch_cache = aa.FetchCache()
+    fetch_cache.record_shard("austin", "2025-11-03", full)
+    monkeypatch.setattr(aa, "fetch_page", lambda *a, **k: aa.Calendar())
+
+    cal = aa.fetch_sharded("austin", "https://x.test/austin", None, next_run(fetch_cache), TODAY)
+    assert snapshot(cal) == snapshot(full)
+
+
+def test_far_window_refresh_is_committed_on_unchanged_runs(server, sharded, fetched, conn, monkeypatch):
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return TODAY
+
+    # save_fetch_cache prunes windows that ended before today
+    monkeypatch.setattr(aa, "date", Today)
+    url = server.url("/500/austin?showCalendar=true")
+
+    def run():
+        fetched.clear()
+        fetch_cache = aa.load_fetch_cache(conn)
+        cal = aa.fetch_sharded("austin", url, None, fetch_cache, TODAY)
+        aa.update_state(conn, {"austin": cal}, fetch_cache)
+        return cal
+
+    def far_fetched():
+        return conn.execute("SELECT fetched FROM shard_cache WHERE start = '2025-11-10'").fetchone()[0]
+
+    assert run() and sorted(fetched) == ["2025-11-03", "2025-11-10"]
+    stale = (datetime.now() - timedelta(hours=25)).isoformat(timespec="seconds")
+    with conn:
+        conn.execute("UPDATE shard_cache SET fetched = ? WHERE start = '2025-11-10'", (stale,))
+
+    assert run().unchanged and sorted(fetched) == ["2025-11-03", "2025-11-10"]
+    assert far_fetched() > stale
+    assert run().unchanged and fetched == ["2025-11-03"]
@@ -0,0 +1,60 @@
+"""MarketState.apply: first sighting alerts once, short absences don't re-alert, expiry does."""
+
+import alamo_alert as aa
+
+
+def films(*titles):
+    return {aa.slugify(t): aa.Film(aa.slugify(t), t) for t in titles}
+
+
+def run(state, cal, n):
+    new, _ = state.apply(cal, f"2025-11-01T00:{n:02d}:00")
+    state.mark_alerted(new)
+    return [state.title(s) for s in new]
+
+
+def test_new_film_alerts_once():
+    state = aa.MarketState()
+    assert run(state, films("Alien", "Heat"), 0) == ["Alien", "Heat"]
+    assert run(state, films("Alien", "Heat"), 1) == []
+    assert run(state, films("Alien", "Heat", "Ran"), 2) == ["Ran"]
+
+
+def test_short_absence_does_not_realert():
+    state = aa.MarketState()
+    run(state, films("Alien", "Heat"), 0)
+    for n in range(1, aa.MISS_EXPIRY):
+        run(state, films("Heat"), n)
+    assert state.records["alien"]["misses"] == aa.MISS_EXPIRY - 1
+    assert run(state, films("Alien", "Heat"), 10) == []
+    assert state.records["alien"]["misses"] == 0
+    assert state.records["alien"]["last_seen"] == "2025-11-01T00:10:00"
+
+
+def test_expired_film_realerts():
+    state = aa.MarketState()
+    run(state, films("Alien", "Heat"), 0)
+    for n in range(1, aa.MISS_EXPIRY + 1):
+        run(state, films("Heat"), n)
+    assert "alien" not in state.records
+    assert run(state, films("Alien", "Heat"), 20) == ["Alien"]
+
+
+def test_retitled_film_keeps_its_history():
+    state = aa.MarketState()
+    run(state, {"alien": aa.Film("alien", "Alien")}, 0)
+    assert run(state, {"alien": aa.Film("alien", "ALIEN (1979)")}, 1) == []
+    assert state.records["alien"]["title"] == "ALIEN (1979)"
+    assert state.records["alien"]["first_seen"] == "2025-11-01T00:00:00"
+
+
+def test_state_round_trips_through_sqlite(conn):
+    cache = aa.load_cache(conn, ["austin"])
+    run(cache["austin"], films("Alien", "Heat"), 0)
+    run(cache["austin"], films("Heat"), 1)
+    aa.save_cache(conn, cache)
+
+    again = aa.load_cache(conn, ["austin"])["austin"]
+    assert again.present == {"heat"} and again.missing == {"alien"}
+    assert again.records["alien"]["misses"] == 1 and again.records["alien"]["alerted"]
+    assert run(again, films("Alien", "Heat"), 2) == []
@@ -0,0 +1,88 @@
+"""Ranked extraction: which strategy may win, and what a winner commits the market to."""
+
+import json
+
+import pytest
+
+import alamo_alert as aa
+from fixtures import calendar_html
+
+SITE_STATE = '<script id="__NEXT_DATA__" type="application/json">' + json.dumps({"props": {"pageProps": {
+    "venues": [{"slug": "south-lamar", "title": "South Lamar"}, {"slug": "mueller", "title": "Mueller"}],
+    "pages": [{"slug": "gift-cards", "title": "Gift Cards"}],
+}}}) + "</script>"
+
+
+def with_script(html, script):
+    return html.replace("</body>", script + "</body>")
+
+
+def test_unrelated_state_blob_does_not_beat_the_table():
+    html = with_script(calendar_html(200), SITE_STATE)
+    fetch_cache = aa.FetchCache()
+    cal = aa.extract_ranked(html, "austin", fetch_cache)
+    assert cal.titles == aa.extract_table(html).titles and len(cal.titles) == 20
+    assert fetch_cache.strategy("austin") == "table"
+
+
+def test_state_with_showtimes_wins():
+    fetch_cache = aa.FetchCache()
+    cal = aa.extract_ranked(calendar_html(200, embed="next"), "austin", fetch_cache)
+    assert cal.showings and fetch_cache.strategy("austin") == "state"
+
+
+def test_cached_state_winner_is_dropped_when_it_degrades():
+    fetch_cache = aa.FetchCache(strategies={"austin": "state"})
+    cal = aa.extract_ranked(with_script(calendar_html(200), SITE_STATE), "austin", fetch_cache)
+    assert len(cal.titles) == 20 and fetch_cache.strategy("austin") == "table"
+
+
+def page(*titles):
+    """The table lists Alien only; the Next.js state holds the real schedule."""
+    state = {"props": {"pageProps": {
+        "presentations": [{"slug": t.lower(), "show": {"title": t}} for t in titles],
+        "sessions": [{"presentationSlug": t.lower(), "showTimeClt": "2025-11-03T19:00:00"} for t in titles],
+    }}}
+    return ('<html><body><table><tr><td><a href="/austin/film/alien">Alien</a></td></tr></table>'
+            + f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(state)}</script></body></html>').encode()
+
+
+def test_state_changes_outside_the_table_are_not_short_circuited(monkeypatch):
+    served = {}
+    monkeypatch.setattr(aa, "http_fetch", lambda url, *a, **k: (served["body"], {}))
+
+    def run(fetch_cache, *titles):
+        served["body"] = page(*titles)
+        cal = aa.fetch_calendar_http("austin", "https://x.test/austin", fetch_cache, api=False)
+        return cal, aa.FetchCache({**fetch_cache.entries, **fetch_cache.updated},
+                                  {**fetch_cache.strategies, **fetch_cache.updated_strategies})
+
+    cal, fetch_cache = run(aa.FetchCache(), "Alien", "Heat")
+    assert cal.titles == {"Alien", "Heat"}
+    cal, fetch_cache = run(fetch_cache, "Alien", "Heat", "Rango")
+    assert not cal.unchanged and "Rango" in cal.titles
+    cal, _ = run(fetch_cache, "Alien", "Heat", "Rango")
+    assert cal.unchanged
+
+
+HERO = (b'<html><body><nav><a href="/austin/film/nav-pick">Staff Pick</a></nav><div class="hero">'
+        b'<a href="/austin/film/alien"><img alt="Alien"></a><a href="/austin/film/heat">Heat</a></div>'
+        b'<div id="root"></div></body></html>')
+
+
+@pytest.fixture
+def hero_page(monkeypatch):
+    monkeypatch.setattr(aa, "http_fetch", lambda url, *a, **k: (HERO, {}))
+    rendered = aa.Calendar({"rango": aa.Film("rango", "Rango")})
+    monkeypatch.setattr(aa, "fetch_calendar_selenium", lambda *a, **k: rendered)
+    return rendered
+
+
+def test_auto_mode_renders_a_cards_only_page(monkeypatch, hero_page):
+    monkeypatch.setattr(aa, "FETCH_MODE", "auto")
+    assert aa.fetch_page("austin", "https://x.test/austin", api=False) is hero_page
+
+
+def test_http_mode_settles_for_cards(monkeypatch, hero_page):
+    monkeypatch.setattr(aa, "FETCH_MODE", "http")
+    assert aa.fetch_page("austin", "https://x.test/austin", api=False).titles == {"Alien", "Heat"}
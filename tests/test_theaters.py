@@ -0,0 +1,37 @@
+"""Concurrent theater fetch: a theater past THEATER_TIMEOUT is dropped along with its cache writes."""
+
+import asyncio
+import time
+
+import alamo_alert as aa
+
+
+def fake_fetch(market, url, warm, fetch_cache):
+    if market == "slow":
+        time.sleep(3)
+    fetch_cache.record(url, digest=market)
+    fetch_cache.record_strategy(market, "table")
+    return aa.Calendar({market: aa.Film(market, market.title())})
+
+
+def test_timed_out_theater_leaves_no_cache_writes(monkeypatch):
+    monkeypatch.setattr(aa, "THEATER_TIMEOUT", 0.5)
+    monkeypatch.setattr(aa, "fetch_calendar", fake_fetch)
+    fetch_cache = aa.FetchCache()
+    start = time.monotonic()
+    result = asyncio.run(aa.fetch_all_theaters({"fast": "u1", "slow": "u2"}, aa.DriverPool(2), fetch_cache))
+    assert time.monotonic() - start < 2
+    assert list(result) == ["fast"]
+    assert list(fetch_cache.updated) == ["u1"]
+    assert fetch_cache.updated_strategies == {"fast": "table"}
+
+
+def test_crashed_theater_is_left_out(monkeypatch):
+    def crash(market, url, warm, fetch_cache):
+        if market == "bad":
+            raise RuntimeError("boom")
+        return fake_fetch(market, url, warm, fetch_cache)
+
+    monkeypatch.setattr(aa, "fetch_calendar", crash)
+    result = asyncio.run(aa.fetch_all_theaters({"good": "u1", "bad": "u2"}, aa.DriverPool(2), aa.FetchCache()))
+    assert list(result) == ["good"]
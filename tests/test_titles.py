@@ -0,0 +1,110 @@
+"""Title variants: normalization, the trigram index's sequel/year guards, and grouping before the diff."""
+
+import pytest
+
+import alamo_alert as aa
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Alien", ("alien", None)),
+    ("ALIEN (1979)", ("alien", "1979")),
+    ("Alien: Quote-Along", ("alien", None)),
+    ("Alien – 35mm (1979)", ("alien", "1979")),
+    ("Alien [Open Caption]", ("alien", None)),
+    ("Ｂlade Runner 2049", ("blade runner 2049", None)),
+    ("2001: A Space Odyssey", ("2001 a space odyssey", None)),
+])
+def test_split_title(title, expected):
+    assert aa.split_title(title) == expected
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("the godfather part ii", ("2",)),
+    ("part two", ("2",)),
+    ("star wars episode vi return of the jedi", ("6",)),
+    ("x men 2", ("10", "2")),
+    ("mix civil vivid", ()),
+])
+def test_title_numbers(title, expected):
+    assert aa.title_numbers(title) == expected
+
+
+def index(**titles):
+    idx = aa.TitleIndex()
+    for key, title in titles.items():
+        idx.add(key, title)
+    return idx
+
+
+@pytest.mark.parametrize("known, new", [
+    ("The Godfather Part II", "The Godfather Part III"),
+    ("Halloween II", "Halloween III"),
+    ("Star Wars: Episode V - The Empire Strikes Back", "Star Wars: Episode VI - The Empire Strikes Back"),
+    ("Toy Story 3", "Toy Story 4"),
+    ("Paddington 2", "Paddington Two Three"),
+])
+def test_sequels_stay_apart(known, new):
+    assert index(k=known).match(new) is None
+
+
+@pytest.mark.parametrize("known, new", [
+    ("The Godfather Part II", "The Godfather: Part II (Open Caption)"),
+    ("Alien", "ALIEN (1979)"),
+    ("Everything Everywhere All at Once", "Everything Everywhere All at Oncee"),
+])
+def test_variants_match(known, new):
+    assert index(k=known).match(new) == "k"
+
+
+def test_years_keep_remakes_apart():
+    idx = index(old="Dune (1984)")
+    assert idx.match("Dune (2021)") is None
+    assert idx.match("Dune") == "old" and idx.match("Dune (1984) - 70mm") == "old"
+
+
+def test_exact_title_picks_the_matching_year():
+    idx = index(a="Nosferatu (1922)", b="Nosferatu (2024)")
+    assert idx.match("NOSFERATU (2024)") == "b"
+
+
+def test_threshold_one_is_exact_only():
+    idx = aa.TitleIndex(threshold=1)
+    idx.add("k", "Everything Everywhere All at Once")
+    assert idx.match("Everything Everywhere All at Oncee") is None
+
+
+def calendar(*films):
+    return aa.Calendar({slug: aa.Film(slug, title) for slug, title in films})
+
+
+def test_known_part_two_does_not_hide_part_three():
+    state = aa.MarketState()
+    state.apply(state.group_films(calendar(("godfather-2", "The Godfather Part II"))).films, "2025-11-01T00:00:00")
+    cal = state.group_films(calendar(("godfather-2", "The Godfather Part II"), ("godfather-3", "The Godfather Part III")))
+    new, _ = state.apply(cal.films, "2025-11-01T00:01:00")
+    assert new == ["godfather-3"]
+
+
+def test_variant_folds_under_known_slug_with_its_showings():
+    state = aa.MarketState()
+    state.apply(calendar(("alien", "Alien")).films, "2025-11-01T00:00:00")
+    cal = calendar(("alien-quote-along", "Alien: Quote-Along"))
+    cal.showings = {aa.Showing("alien-quote-along", "2025-11-03", "7:00PM", "Quote-Along")}
+    grouped = state.group_films(cal)
+    assert set(grouped.films) == {"alien"}
+    assert {sh.slug for sh in grouped.showings} == {"alien"}
+
+
+def test_within_calendar_only_exact_variants_fold():
+    state = aa.MarketState()
+    grouped = state.group_films(calendar(
+        ("alien", "Alien"), ("alien-qa", "Alien (Quote-Along)"),
+        ("nosferatu-1922", "Nosferatu (1922)"), ("nosferatu-2024", "Nosferatu (2024)"),
+        ("eeaao", "Everything Everywhere All at Once"), ("eeaao-typo", "Everything Everywhere All at Oncee"),
+    ))
+    assert set(grouped.films) == {"alien", "nosferatu-1922", "nosferatu-2024", "eeaao", "eeaao-typo"}
+
+
+def test_new_variants_group_under_the_plainest_title():
+    grouped = aa.MarketState().group_films(calendar(("alien-35mm", "Alien - 35mm"), ("alien", "Alien")))
+    assert list(grouped.films) == ["alien"]
@@ -0,0 +1,189 @@
+"""Event-driven waits: against a fake driver whose page changes on a timeline,
+one loading the fixture app's API pages with server-side delays, and, where
+Chrome is installed, the real app page."""
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import alamo_alert as aa
+from fixtures import schedule_page
+
+
+class TimelineDriver:
+    """execute_script returns the strategy markers present `at` seconds in."""
+
+    def __init__(self, timeline):
+        self.start = time.monotonic()
+        self.timeline = timeline
+
+    def execute_script(self, js, *args):
+        elapsed = time.monotonic() - self.start
+        return [name for at, name in self.timeline if elapsed >= at]
+
+
+def test_wait_phase_returns_as_soon_as_ready():
+    driver = TimelineDriver([(0.2, "table")])
+    start = time.monotonic()
+    assert aa.wait_phase(driver, "t", lambda d: d.execute_script(""), 5)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_phase_times_out():
+    assert not aa.wait_phase(TimelineDriver([]), "t", lambda d: d.execute_script(""), 0.3)
+
+
+def test_calendar_wait_holds_out_for_the_table(monkeypatch):
+    monkeypatch.setattr(aa, "LAYOUT_GRACE", 1.0)
+    driver = TimelineDriver([(0, "cards"), (0.3, "table")])
+    assert aa.wait_for_calendar(driver, idle=True) == ["cards", "table"]
+
+
+def test_calendar_wait_accepts_cards_after_grace(monkeypatch):
+    monkeypatch.setattr(aa, "LAYOUT_GRACE", 0.3)
+    start = time.monotonic()
+    assert aa.wait_for_calendar(TimelineDriver([(0, "cards")]), idle=True) == ["cards"]
+    assert time.monotonic() - start >= 0.3
+
+
+def test_calendar_wait_fails_fast_without_markup(monkeypatch):
+    monkeypatch.setattr(aa, "LAYOUT_GRACE", 0.3)
+    start = time.monotonic()
+    with pytest.raises(TimeoutException):
+        aa.wait_for_calendar(TimelineDriver([]), idle=True)
+    assert time.monotonic() - start < aa.PAGE_READY_TIMEOUT
+
+
+def test_server_delay(server):
+    start = time.monotonic()
+    urllib.request.urlopen(server.url("/api/50/austin?page=1&delay=300")).read()
+    assert time.monotonic() - start >= 0.3
+
+
+class Button:
+    def __init__(self, shown):
+        self.shown = shown
+
+    def is_displayed(self):
+        return self.shown
+
+
+class AppDriver:
+    """Stands in for Chrome on the /app fixture page: every Load More click
+    fetches the next API page from the fixture server in the background and
+    adds its rows when it arrives. The watcher scripts are answered the way
+    WATCHERS_JS keeps score in the page."""
+
+    def __init__(self, server, size, delay_ms):
+        self.api = server.url(f"/api/{size}/austin?delay={delay_ms}&page=")
+        self.lock = threading.Lock()
+        self.links = self.page = self.inflight = 0
+        self.more = True
+        self.last_mutation = self.last_response = time.monotonic()
+        self.load()
+
+    def load(self):
+        with self.lock:
+            self.inflight += 1
+            page = self.page + 1
+
+        def fetch():
+            body = json.loads(urllib.request.urlopen(self.api + str(page)).read())
+            with self.lock:
+                self.page, self.more = body["meta"]["page"], body["meta"]["hasMore"]
+                self.links += len(body["data"]["presentations"]) + len(body["data"]["sessions"])
+                self.inflight -= 1
+                self.last_mutation = self.last_response = time.monotonic()
+
+        threading.Thread(target=fetch, daemon=True).start()
+
+    def find_element(self, by, value):
+        return Button(self.more)
+
+    def execute_script(self, js, *args):
+        def since(t):
+            return (time.monotonic() - t) * 1000
+
+        with self.lock:
+            if js == aa.LINK_COUNT_JS:
+                return self.links
+            if js == aa.DOM_QUIET_JS:
+                return since(self.last_mutation) >= args[0]
+            if js == aa.NETWORK_IDLE_JS:
+                return not self.inflight and since(self.last_response) >= args[0]
+        if js.endswith("click();"):
+            self.load()
+
+
+def app_links(size, pages=None):
+    """Film and showtime links the app renders from its first `pages` API pages (all by default)."""
+    n, total, more = 0, 0, True
+    while more and (pages is None or n < pages):
+        n += 1
+        page = schedule_page(size, page=n)
+        total += len(page["data"]["presentations"]) + len(page["data"]["sessions"])
+        more = page["meta"]["hasMore"]
+    return total
+
+
+def test_network_idle_waits_for_a_slow_response(server):
+    driver = AppDriver(server, 50, 400)
+    start = time.monotonic()
+    assert not aa.network_idle(200)(driver)
+    assert aa.wait_phase(driver, "network_idle", aa.network_idle(200), 5)
+    assert time.monotonic() - start >= 0.6 and driver.links == app_links(50)
+
+
+def test_dom_quiet_period_restarts_with_each_mutation(server):
+    driver = AppDriver(server, 50, 0)
+    aa.wait_phase(driver, "loaded", lambda d: d.links, 5)
+    assert not aa.dom_quiet(300)(driver)
+    time.sleep(0.3)
+    assert aa.dom_quiet(300)(driver)
+
+
+def test_load_more_waits_out_slow_pages(server):
+    # Each page takes longer than the DOM quiet period: only growth may end a wait
+    driver = AppDriver(server, 500, 500)
+    aa.wait_phase(driver, "initial", lambda d: d.links, 5)
+    start = time.monotonic()
+    aa.click_load_more(driver)
+    assert driver.links == app_links(500) and driver.page == 5
+    assert time.monotonic() - start >= 4 * 0.5
+
+
+def test_load_more_gives_up_on_a_page_that_never_comes(server, monkeypatch, caplog):
+    monkeypatch.setattr(aa, "LOAD_MORE_TIMEOUT", 0.3)
+    driver = AppDriver(server, 500, 0)
+    aa.wait_phase(driver, "initial", lambda d: d.links, 5)
+    driver.api = driver.api.replace("delay=0", "delay=1500")
+    with caplog.at_level(logging.WARNING):
+        aa.click_load_more(driver)
+    assert "Load More added no rows" in caplog.text and driver.page == 1
+
+
+@pytest.fixture
+def chrome(needs_chrome):
+    try:
+        driver = aa.get_driver()
+    except WebDriverException as e:
+        pytest.skip(f"Chrome would not start: {e}")
+    yield driver
+    driver.quit()
+
+
+def test_waits_in_chrome(chrome, server):
+    chrome.get(server.url("/app/500/austin?delay=300"))
+    aa.install_watchers(chrome)
+    assert aa.wait_phase(chrome, "network_idle", aa.network_idle(), 10)
+    assert aa.link_count(chrome) == app_links(500, 1)
+    aa.click_load_more(chrome)
+    assert aa.link_count(chrome) == app_links(500)
+    chrome.execute_script("document.body.appendChild(document.createElement('p'));")
+    assert not aa.dom_quiet()(chrome)
+    assert aa.wait_phase(chrome, "quiet", aa.dom_quiet(), 5)
@@ -0,0 +1,127 @@
+"""XHR capture: schedule JSON read back from the performance log, paged by clicks or fetched directly."""
+
+import base64
+import json
+import logging
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+import alamo_alert as aa
+from conftest import snapshot
+from fixtures import calendar_html, schedule_page
+
+
+class Button:
+    def __init__(self, shown):
+        self.shown = shown
+
+    def is_displayed(self):
+        return self.shown
+
+
+class NetworkLogDriver:
+    """Replays `responses` (url, JSON body) as CDP events, one per page load or Load More click."""
+
+    def __init__(self, responses, button=True):
+        self.responses = responses
+        self.button = button
+        self.loaded = 0
+        self.clicks = 0
+        self.log = []
+        self.bodies = {}
+
+    def load(self):
+        if self.loaded >= len(self.responses):
+            return
+        url, data = self.responses[self.loaded]
+        body = json.dumps(data)
+        rid = f"r{self.loaded}"
+        # Odd pages come back base64-encoded, as Chrome does for some bodies
+        self.bodies[rid] = {"body": base64.b64encode(body.encode()).decode(), "base64Encoded": True} \
+            if self.loaded % 2 else {"body": body, "base64Encoded": False}
+        self.loaded += 1
+        self.emit("Network.requestWillBeSent", "img" + rid, request={"url": "https://drafthouse.test/poster.jpg"})
+        self.emit("Network.responseReceived", "img" + rid,
+                  response={"url": "https://drafthouse.test/poster.jpg", "mimeType": "image/jpeg", "status": 200})
+        self.emit("Network.loadingFinished", "img" + rid, encodedDataLength=1000)
+        self.emit("Network.requestWillBeSent", rid, request={"url": url})
+        self.emit("Network.responseReceived", rid, type="Fetch",
+                  response={"url": url, "mimeType": "application/json", "status": 200})
+        self.emit("Network.loadingFinished", rid, encodedDataLength=len(body))
+
+    def emit(self, method, rid, **params):
+        self.log.append({"message": json.dumps({"message": {"method": method, "params": {"requestId": rid, **params}}})})
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, args):
+        assert cmd == "Network.getResponseBody"
+        return self.bodies[args["requestId"]]
+
+    def find_element(self, by, value):
+        if not self.button:
+            raise NoSuchElementException("no button")
+        return Button(self.loaded < len(self.responses))
+
+    def execute_script(self, js, *args):
+        if "click()" in js:
+            self.clicks += 1
+            self.load()
+
+    def get_cookies(self):
+        return [{"name": "sid", "value": "abc"}]
+
+
+@pytest.fixture(autouse=True)
+def no_waits(monkeypatch):
+    monkeypatch.setattr(aa, "wait_phase", lambda *a, **k: True)
+
+
+def captured(driver):
+    capture = aa.XhrCapture("austin")
+    driver.load()
+    capture.poll(driver)
+    return capture, aa.capture_calendar(driver, "austin", capture)
+
+
+def test_clicks_until_the_api_says_no_more():
+    # No page parameter in the URL: prefetch can't work out the paging, so it clicks
+    driver = NetworkLogDriver([("https://drafthouse.test/api/schedule", schedule_page(500, page=p))
+                               for p in range(1, 6)])
+    capture, cal = captured(driver)
+    assert driver.clicks == 4 and capture.more is False
+    assert len(capture.bodies) == 5 and capture.urls == ["https://drafthouse.test/api/schedule"] * 5
+    assert snapshot(cal) == snapshot(aa.extract_table(calendar_html(500)))
+
+
+def test_step_without_new_data_stops(caplog):
+    # The API claims more pages, but scrolling (no visible button) brings none
+    driver = NetworkLogDriver([("https://drafthouse.test/api/schedule", schedule_page(500, page=1))])
+    with caplog.at_level(logging.INFO):
+        capture, cal = captured(driver)
+    assert driver.clicks == 0 and capture.more is True
+    assert len(cal.films) == 10
+    assert "scroll 1 brought no new schedule data" in caplog.text
+
+
+def test_known_paging_prefetches_the_rest(server):
+    url = server.url("/api/500/austin?page=1")
+    driver = NetworkLogDriver([(url, schedule_page(500, page=1))])
+    capture, cal = captured(driver)
+    assert driver.clicks == 0 and capture.more is False
+    assert snapshot(cal) == snapshot(aa.extract_table(calendar_html(500)))
+
+
+def test_other_traffic_is_ignored_but_kept_for_accounting():
+    driver = NetworkLogDriver([("https://drafthouse.test/fonts/list.json", {"presentations": []}),
+                               ("https://drafthouse.test/api/schedule", schedule_page(200, page=1))])
+    capture = aa.XhrCapture("austin")
+    driver.load()
+    assert capture.poll(driver) == 0
+    driver.load()
+    assert capture.poll(driver) == 1
+    assert capture.urls == ["https://drafthouse.test/api/schedule"]
+    assert aa.network_usage(capture.events)["allowed"] == 4